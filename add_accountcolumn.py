@@ -0,0 +1,44 @@
+"""
+Migration script to add account column to trades table
+Run this script once to update your existing database
+"""
+
+import sqlite3
+import sys
+
+def add_account_column():
+    try:
+        # Connect to database
+        conn = sqlite3.connect('trading_system.db')
+        cursor = conn.cursor()
+        
+        # Check if account column already exists
+        cursor.execute("PRAGMA table_info(trades)")
+        columns = [column[1] for column in cursor.fetchall()]
+        
+        if 'account' in columns:
+            print("account column already exists. No migration needed.")
+            return
+        
+        # Add account column and its index
+        print("Adding account column to trades table...")
+        cursor.execute("""
+            ALTER TABLE trades 
+            ADD COLUMN account VARCHAR
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS ix_trades_account
+            ON trades (account)
+        """)
+        
+        conn.commit()
+        print("Successfully added account column!")
+        
+        conn.close()
+        
+    except Exception as e:
+        print(f"Error during migration: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    add_account_column()
@@ -0,0 +1,44 @@
+"""
+Migration script to add idempotency_key column to trades table
+Run this script once to update your existing database
+"""
+
+import sqlite3
+import sys
+
+def add_idempotency_column():
+    try:
+        # Connect to database
+        conn = sqlite3.connect('trading_system.db')
+        cursor = conn.cursor()
+        
+        # Check if idempotency_key column already exists
+        cursor.execute("PRAGMA table_info(trades)")
+        columns = [column[1] for column in cursor.fetchall()]
+        
+        if 'idempotency_key' in columns:
+            print("idempotency_key column already exists. No migration needed.")
+            return
+        
+        # Add idempotency_key column and its unique index
+        print("Adding idempotency_key column to trades table...")
+        cursor.execute("""
+            ALTER TABLE trades 
+            ADD COLUMN idempotency_key VARCHAR
+        """)
+        cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS ix_trades_idempotency_key
+            ON trades (idempotency_key)
+        """)
+        
+        conn.commit()
+        print("Successfully added idempotency_key column!")
+        
+        conn.close()
+        
+    except Exception as e:
+        print(f"Error during migration: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    add_idempotency_column()
@@ -0,0 +1,48 @@
+"""
+Migration script to add the trade history indexes to the trades table
+Run this script once to update your existing database
+"""
+
+import sqlite3
+import sys
+
+# name: columns; must match Trade.__table_args__ in backend/models.py
+INDEXES = {
+    "ix_trades_created_at_id": "created_at, id",
+    "ix_trades_symbol_created_at_id": "symbol, created_at, id",
+    "ix_trades_status_created_at_id": "status, created_at, id",
+}
+
+def add_trade_history_indexes():
+    try:
+        # Connect to database
+        conn = sqlite3.connect('trading_system.db')
+        cursor = conn.cursor()
+        
+        # Check which indexes already exist
+        cursor.execute("PRAGMA index_list(trades)")
+        existing = {row[1] for row in cursor.fetchall()}
+        missing = {name: columns for name, columns in INDEXES.items() if name not in existing}
+        
+        if not missing:
+            print("Trade history indexes already exist. No migration needed.")
+            return
+        
+        for name, columns in missing.items():
+            print(f"Creating index {name} on trades ({columns})...")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON trades ({columns})")
+        
+        # Let the query planner see the new indexes
+        cursor.execute("ANALYZE trades")
+        
+        conn.commit()
+        print("Successfully added trade history indexes!")
+        
+        conn.close()
+        
+    except Exception as e:
+        print(f"Error during migration: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    add_trade_history_indexes()
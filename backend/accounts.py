@@ -0,0 +1,108 @@
+from bybit_client import BybitClient, bybit_client
+from position_book import PositionBook
+from risk_engine import RiskEngine, risk_engine
+from rate_limiter import RateLimiter
+from logger import get_logger
+from typing import Dict, Any, List, Optional
+from config import config
+import json
+
+logger = get_logger(__name__)
+
+class Account:
+    """One Bybit account a signal can be executed on.
+
+    Each account is held to the pre-trade limits on its own positions.
+    A fan-out account's position book has no stream; it is loaded from
+    REST and kept current from the account's own fills.
+    """
+
+    def __init__(self, name: str, client: BybitClient, multiplier: float = 1.0,
+                 risk: Optional[RiskEngine] = None):
+        self.name = name
+        self.client = client
+        self.multiplier = multiplier
+        self.risk = risk or RiskEngine(
+            config.MAX_POSITIONS,
+            config.MAX_GROSS_EXPOSURE,
+            PositionBook(config.POSITION_RECONCILE_DEBOUNCE, client)
+        )
+        self.orders = 0
+        self.failures = 0
+        self.total_latency = 0.0
+
+    def record(self, success: bool, latency: float):
+        self.orders += 1
+        self.total_latency += latency
+        if not success:
+            self.failures += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "testnet": self.client.testnet,
+            "multiplier": self.multiplier,
+            "orders": self.orders,
+            "failures": self.failures,
+            "avg_latency_ms": (self.total_latency / self.orders * 1000) if self.orders else 0.0
+        }
+
+class AccountRegistry:
+    """Accounts from config.json, each with its own pooled client.
+
+    Entries look like ``{"api_key": ..., "api_secret": ..., "testnet": true,
+    "multiplier": 0.5}``; ``testnet``, ``base_url`` and ``multiplier`` are
+    optional. Only the accounts named in FANOUT_ACCOUNTS receive signals,
+    in addition to the primary account configured through the environment.
+    All clients share one per-IP rate-limit bucket.
+    """
+
+    def __init__(self, path: str, fanout: List[str]):
+        self.path = path
+        self.fanout = fanout
+        # The environment-configured account behind bybit_client
+        self.primary = Account("primary", bybit_client, risk=risk_engine)
+        self.accounts: Dict[str, Account] = {}
+
+    def load(self):
+        """Create clients for the fan-out accounts; unknown names are skipped"""
+        if not self.fanout:
+            return
+        try:
+            with open(self.path, "r") as file:
+                entries = json.load(file)
+        except Exception as e:
+            logger.error("Cannot load accounts from %s: %s", self.path, e)
+            return
+
+        shared_bucket = bybit_client.rate_limiter.global_bucket
+        for name in self.fanout:
+            entry = entries.get(name)
+            if not entry or not entry.get("api_key") or not entry.get("api_secret"):
+                logger.error("Account %s is missing from %s", name, self.path)
+                continue
+            client = BybitClient(
+                api_key=entry["api_key"],
+                api_secret=entry["api_secret"],
+                testnet=entry.get("testnet", config.BYBIT_TESTNET),
+                base_url=entry.get("base_url"),
+                rate_limiter=RateLimiter(global_bucket=shared_bucket)
+            )
+            self.accounts[name] = Account(name, client, float(entry.get("multiplier", 1.0)))
+        logger.info("Fan-out accounts loaded", extra={"accounts": list(self.accounts)})
+
+    def get(self, name: str) -> Optional[Account]:
+        return self.accounts.get(name)
+
+    def targets(self) -> List[Account]:
+        """Accounts every single-leg signal is copied to, besides the primary"""
+        return list(self.accounts.values())
+
+    def stats(self) -> Dict[str, Any]:
+        accounts = [self.primary] + self.targets()
+        return {account.name: account.stats() for account in accounts}
+
+    async def close(self):
+        for account in self.accounts.values():
+            await account.client.close()
+
+account_registry = AccountRegistry(config.ACCOUNTS_CONFIG_PATH, config.FANOUT_ACCOUNTS)
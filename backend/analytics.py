@@ -0,0 +1,200 @@
+from models import Trade
+from database import async_session_maker
+from position_book import position_book
+from logger import get_logger
+from sqlalchemy import select
+from typing import Dict, Any, Optional
+from datetime import datetime
+import asyncio
+import json
+import pandas as pd
+
+logger = get_logger(__name__)
+
+UNTAGGED = "untagged"
+
+def strategy_tag(webhook_data: Optional[str]) -> str:
+    """Strategy tag of a trade: the alert_message of the signal behind it"""
+    if not webhook_data:
+        return UNTAGGED
+    try:
+        return json.loads(webhook_data).get("alert_message") or UNTAGGED
+    except (ValueError, AttributeError):
+        return UNTAGGED
+
+class PnlStats:
+    """Running realised-PnL statistics for one bucket of closed trades"""
+    __slots__ = ("trades", "wins", "losses", "realized_pnl", "gross_profit",
+                 "gross_loss", "cumulative", "peak", "max_drawdown")
+
+    def __init__(self):
+        for field in self.__slots__:
+            setattr(self, field, 0 if field in ("trades", "wins", "losses") else 0.0)
+
+    def add(self, pnl: float):
+        self.trades += 1
+        self._count(pnl, 1)
+        self.cumulative += pnl
+        self.peak = max(self.peak, self.cumulative)
+        self.max_drawdown = max(self.max_drawdown, self.peak - self.cumulative)
+
+    def correct(self, old_pnl: float, new_pnl: float):
+        """Replace a trade's PnL already counted here.
+
+        The drawdown path is not replayed; a rebuild recomputes it exactly.
+        """
+        self._count(old_pnl, -1)
+        self._count(new_pnl, 1)
+        self.cumulative += new_pnl - old_pnl
+        self.peak = max(self.peak, self.cumulative)
+        self.max_drawdown = max(self.max_drawdown, self.peak - self.cumulative)
+
+    def _count(self, pnl: float, sign: int):
+        if pnl > 0:
+            self.wins += sign
+            self.gross_profit += sign * pnl
+        elif pnl < 0:
+            self.losses += sign
+            self.gross_loss += sign * pnl
+        self.realized_pnl += sign * pnl
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trades": self.trades,
+            "wins": self.wins,
+            "losses": self.losses,
+            "win_rate": self.wins / self.trades if self.trades else 0.0,
+            "realized_pnl": self.realized_pnl,
+            "gross_profit": self.gross_profit,
+            "gross_loss": self.gross_loss,
+            "profit_factor": self.gross_profit / -self.gross_loss if self.gross_loss else None,
+            "average_pnl": self.realized_pnl / self.trades if self.trades else 0.0,
+            "max_drawdown": self.max_drawdown,
+            "current_drawdown": self.peak - self.cumulative
+        }
+
+class Analytics:
+    """Performance aggregates kept up to date as trades close.
+
+    Every closed trade (one with a realised PnL) is added to the overall,
+    per-symbol, per-day and per-strategy buckets when its PnL arrives, so
+    reading them never touches the trades table. ``rebuild`` recomputes
+    everything from history with pandas, e.g. at startup.
+    """
+
+    def __init__(self):
+        self.overall = PnlStats()
+        self.by_symbol: Dict[str, PnlStats] = {}
+        self.by_day: Dict[str, PnlStats] = {}
+        self.by_strategy: Dict[str, PnlStats] = {}
+        self.rebuilt_at: Optional[datetime] = None
+        # Held by rebuilds and by writers of Trade.pnl around their commit
+        self.lock = asyncio.Lock()
+
+    def record_pnl(self, trade: Trade, previous_pnl: Optional[float] = None):
+        """Count a trade whose realised PnL was just set or corrected"""
+        if trade.pnl is None:
+            return
+        day = (trade.created_at or datetime.utcnow()).date().isoformat()
+        buckets = (
+            self.overall,
+            self.by_symbol.setdefault(trade.symbol, PnlStats()),
+            self.by_day.setdefault(day, PnlStats()),
+            self.by_strategy.setdefault(strategy_tag(trade.webhook_data), PnlStats())
+        )
+        for stats in buckets:
+            if previous_pnl is None:
+                stats.add(trade.pnl)
+            else:
+                stats.correct(previous_pnl, trade.pnl)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "overall": self.overall.to_dict(),
+            "by_symbol": {key: stats.to_dict() for key, stats in self.by_symbol.items()},
+            "by_day": {key: stats.to_dict() for key, stats in sorted(self.by_day.items())},
+            "by_strategy": {key: stats.to_dict() for key, stats in self.by_strategy.items()},
+            "exposure": self.exposure(),
+            "rebuilt_at": self.rebuilt_at.isoformat() if self.rebuilt_at else None
+        }
+
+    def exposure(self) -> Dict[str, Any]:
+        """Open notional from the position book, at mark price where known"""
+        by_symbol = {}
+        long_notional = short_notional = 0.0
+        for position in position_book.all():
+            price = position.get("current_price") or position["entry_price"]
+            notional = position["size"] * price
+            by_symbol[position["symbol"]] = notional
+            if position["side"].lower() == "buy":
+                long_notional += notional
+            else:
+                short_notional += notional
+        return {
+            "gross": long_notional + short_notional,
+            "net": long_notional - short_notional,
+            "long": long_notional,
+            "short": short_notional,
+            "by_symbol": by_symbol
+        }
+
+    async def rebuild(self):
+        """Recompute every aggregate from the closed trades in the database"""
+        async with self.lock:
+            async with async_session_maker() as session:
+                result = await session.execute(
+                    select(Trade.symbol, Trade.pnl, Trade.created_at, Trade.webhook_data)
+                    .where(Trade.pnl.is_not(None))
+                    .order_by(Trade.created_at, Trade.id)
+                )
+                frame = pd.DataFrame(result.all(), columns=["symbol", "pnl", "created_at", "webhook_data"])
+
+            frame["day"] = pd.to_datetime(frame["created_at"]).dt.strftime("%Y-%m-%d")
+            frame["strategy"] = frame["webhook_data"].map(strategy_tag)
+
+            self.overall = _stats_for(frame).get("all", PnlStats())
+            self.by_symbol = _stats_for(frame, "symbol")
+            self.by_day = _stats_for(frame, "day")
+            self.by_strategy = _stats_for(frame, "strategy")
+            self.rebuilt_at = datetime.utcnow()
+        logger.info("Analytics rebuilt from %d closed trades", len(frame))
+
+def _stats_for(frame: pd.DataFrame, key: Optional[str] = None) -> Dict[str, PnlStats]:
+    """PnlStats per group of ``key`` (or one "all" group), computed column-wise"""
+    if frame.empty:
+        return {}
+    groups = frame.assign(group="all" if key is None else frame[key])
+    pnl = groups["pnl"]
+    groups = groups.assign(
+        win=(pnl > 0).astype(int),
+        loss=(pnl < 0).astype(int),
+        profit=pnl.clip(lower=0),
+        deficit=pnl.clip(upper=0),
+        cumulative=pnl.groupby(groups["group"]).cumsum()
+    )
+    # Drawdown from the running peak, which starts at zero
+    groups["peak"] = groups.groupby("group")["cumulative"].cummax().clip(lower=0)
+    groups["drawdown"] = groups["peak"] - groups["cumulative"]
+
+    summary = groups.groupby("group").agg(
+        trades=("pnl", "size"),
+        wins=("win", "sum"),
+        losses=("loss", "sum"),
+        realized_pnl=("pnl", "sum"),
+        gross_profit=("profit", "sum"),
+        gross_loss=("deficit", "sum"),
+        cumulative=("cumulative", "last"),
+        peak=("peak", "last"),
+        max_drawdown=("drawdown", "max")
+    )
+
+    result = {}
+    for name, row in summary.iterrows():
+        stats = PnlStats()
+        for field in PnlStats.__slots__:
+            value = row[field]
+            setattr(stats, field, int(value) if field in ("trades", "wins", "losses") else float(value))
+        result[name] = stats
+    return result
+
+analytics = Analytics()
@@ -41,6 +41,16 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security))
             detail="Invalid authentication credentials",
         )
 
+def decode_username(token: Optional[str]) -> Optional[str]:
+    """Return the username for a valid token, None otherwise (for WebSockets)"""
+    if not token:
+        return None
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        return payload.get("sub")
+    except jwt.PyJWTError:
+        return None
+
 # Optional: For endpoints that need auth
 async def get_current_user(token: str = Depends(verify_token)):
     return token
\ No newline at end of file
@@ -1,32 +1,186 @@
-from pybit.unified_trading import HTTP
+import httpx
 from typing import Optional, List, Dict, Any
+from urllib.parse import urlencode
+import asyncio
+import hashlib
+import hmac
+import json
 import os
+import time
 from dotenv import load_dotenv
-import asyncio
-from datetime import datetime
+from cache import SingleFlightCache
+from rate_limiter import RateLimiter
+from config import config
+from logger import get_logger
+import metrics
 
 load_dotenv()
 
+logger = get_logger(__name__)
+
+BYBIT_MAINNET_URL = "https://api.bybit.com"
+BYBIT_TESTNET_URL = "https://api-testnet.bybit.com"
+
+# Bybit retCode returned when the requested leverage equals the current one
+LEVERAGE_NOT_MODIFIED = 110043
+# Bybit retCode for "too many visits"
+RATE_LIMITED = 10006
+
+def parse_position(pos: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Convert a raw v5 position entry (REST or stream) to our position shape.
+
+    Returns None for flat positions.
+    """
+    size = float(pos.get("size") or 0)
+    if size <= 0:
+        return None
+    
+    # REST reports the entry as avgPrice, the private stream as entryPrice
+    entry_price = float(pos.get("avgPrice") or pos.get("entryPrice") or 0)
+    current_price = float(pos.get("markPrice") or entry_price)
+    pnl = float(pos.get("unrealisedPnl") or 0)
+    leverage = float(pos.get("leverage") or 1)
+    position_value = float(pos.get("positionValue") or 0)
+    #calculate margin used
+    margin_used = position_value / leverage if leverage > 0 else position_value
+    # Calculate PnL percentage
+    pnl_percentage = (pnl / margin_used) * 100 if margin_used > 0 else 0
+    
+    return {
+        "symbol": pos["symbol"],
+        "side": pos["side"],
+        "size": size,
+        "leverage": leverage,
+        "entry_price": entry_price,
+        "current_price": current_price,
+        "pnl": pnl,
+        "pnl_percentage": pnl_percentage,
+    }
+
 class BybitClient:
-    def __init__(self):
-        self.api_key = os.getenv("BYBIT_API_KEY")
-        self.api_secret = os.getenv("BYBIT_API_SECRET")
-        self.testnet = os.getenv("BYBIT_TESTNET", "True").lower() == "true"
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None,
+                 testnet: Optional[bool] = None, base_url: Optional[str] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
+        """Credentials default to the BYBIT_* environment variables"""
+        self.api_key = api_key or os.getenv("BYBIT_API_KEY") or ""
+        self.api_secret = api_secret or os.getenv("BYBIT_API_SECRET") or ""
+        if testnet is None:
+            testnet = os.getenv("BYBIT_TESTNET", "True").lower() == "true"
+        self.testnet = testnet
+        self.base_url = (
+            base_url
+            or config.BYBIT_BASE_URL
+            or (BYBIT_TESTNET_URL if self.testnet else BYBIT_MAINNET_URL)
+        )
+        self.recv_window = "5000"
+        
+        # Created lazily so the pool is bound to the running event loop
+        self._http: Optional[httpx.AsyncClient] = None
+        self.rate_limiter = rate_limiter or RateLimiter()
         
-        self.session = HTTP(
-            testnet=self.testnet,
-            api_key=self.api_key,
-            api_secret=self.api_secret
+        # One wallet-balance response shared by check_connection and
+        # get_account_info for ACCOUNT_STATE_TTL seconds
+        self.account_state = SingleFlightCache(
+            self._fetch_wallet_balance,
+            ttl=config.ACCOUNT_STATE_TTL,
+            should_cache=lambda result: result.get("retCode") == 0
         )
         
-    def check_connection(self) -> Dict[str, Any]:
+        # Last known leverage per symbol, so set_leverage is only sent on change
+        self.leverage_cache: Dict[str, float] = {}
+    
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Shared keep-alive connection pool for all REST calls"""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(10.0, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=50,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=60
+                )
+            )
+        return self._http
+    
+    async def close(self):
+        """Close the underlying connection pool"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+    
+    def _sign(self, timestamp: str, payload: str) -> str:
+        """HMAC-SHA256 signature as required by the v5 API"""
+        message = timestamp + self.api_key + self.recv_window + payload
+        return hmac.new(
+            self.api_secret.encode(),
+            message.encode(),
+            hashlib.sha256
+        ).hexdigest()
+    
+    async def _request(self, method: str, path: str,
+                       params: Optional[Dict[str, Any]] = None,
+                       retry_rate_limited: bool = True) -> Dict[str, Any]:
+        """Send a signed v5 request and return the decoded response body"""
+        await self.rate_limiter.acquire(path)
+        
+        params = params or {}
+        timestamp = str(int(time.time() * 1000))
+        
+        if method == "GET":
+            # The signed query string must match the one sent byte for byte
+            payload = urlencode(params)
+            url = f"{path}?{payload}" if payload else path
+            body = None
+        else:
+            payload = json.dumps(params, separators=(",", ":"))
+            url = path
+            body = payload
+        
+        headers = {
+            "X-BAPI-API-KEY": self.api_key,
+            "X-BAPI-TIMESTAMP": timestamp,
+            "X-BAPI-RECV-WINDOW": self.recv_window,
+            "X-BAPI-SIGN": self._sign(timestamp, payload),
+            "Content-Type": "application/json"
+        }
+        
+        start = time.perf_counter()
+        try:
+            response = await self.http.request(method, url, content=body, headers=headers)
+            self.rate_limiter.update_from_headers(path, response.headers)
+            response.raise_for_status()
+            result = response.json()
+        except Exception as e:
+            metrics.bybit_request_errors_total.inc(endpoint=path, code=type(e).__name__)
+            raise
+        finally:
+            metrics.bybit_request_seconds.observe(time.perf_counter() - start, endpoint=path)
+        if result.get("retCode") != 0:
+            metrics.bybit_request_errors_total.inc(endpoint=path, code=str(result.get("retCode")))
+        
+        # Rejected before reaching the matching engine, so a retry is safe
+        if result.get("retCode") == RATE_LIMITED and retry_rate_limited:
+            self.rate_limiter.block(path, response.headers.get("X-Bapi-Limit-Reset-Timestamp"))
+            return await self._request(method, path, params, retry_rate_limited=False)
+        return result
+    
+    async def _fetch_wallet_balance(self) -> Dict[str, Any]:
+        return await self._request("GET", "/v5/account/wallet-balance", {
+            "accountType": "UNIFIED",
+            "coin": "USDT"
+        })
+    
+    def invalidate_account_state(self):
+        """Force the next account lookup to hit the exchange (e.g. after a fill)"""
+        self.account_state.invalidate()
+        
+    async def check_connection(self) -> Dict[str, Any]:
         """Check if Bybit connection is active"""
         try:
             # Try to get account info
-            result = self.session.get_wallet_balance(
-                accountType="UNIFIED",
-                coin="USDT"
-            )
+            result = await self.account_state.get()
             if result["retCode"] == 0:
                 return {
                     "connected": True,
@@ -43,10 +197,10 @@ class BybitClient:
                 "error": str(e)
             }
     
-    def get_account_info(self) -> Dict[str, Any]:
+    async def get_account_info(self) -> Dict[str, Any]:
         """Get account balance and info"""
         try:
-            result = self.session.get_wallet_balance(accountType="UNIFIED")
+            result = await self.account_state.get()
 
             if result["retCode"] == 0:
                 account_data = result["result"]["list"][0]
@@ -78,39 +232,51 @@ class BybitClient:
                 "error": str(e)
             }
     
-    def place_order(self, symbol: str, side: str, qty: float, 
+    def build_order_params(self, symbol: str, side: str, qty: float,
+                           stop_loss: Optional[float] = None,
+                           take_profit: Optional[float] = None) -> Dict[str, Any]:
+        """Market order parameters shared by single and batch placement"""
+        order_params = {
+            "symbol": symbol,
+            "side": side.capitalize(),
+            "orderType": "Market",
+            "qty": str(qty),
+            "timeInForce": "IOC",
+            "positionIdx": 0  # One-way mode
+        }
+        
+        # Add SL/TP if provided
+        if stop_loss:
+            order_params["stopLoss"] = str(stop_loss)
+        if take_profit:
+            order_params["takeProfit"] = str(take_profit)
+        return order_params
+    
+    async def ensure_leverage(self, symbol: str, leverage: Optional[int]) -> Dict[str, Any]:
+        """Set leverage only if it differs from the cached value"""
+        if leverage and leverage > 0 and self.leverage_cache.get(symbol) != float(leverage):
+            return await self.set_leverage(symbol, leverage)
+        return {"success": True, "message": "Leverage unchanged"}
+    
+    async def place_order(self, symbol: str, side: str, qty: float, 
                    leverage: Optional[int] = None,
                    stop_loss: Optional[float] = None, 
                    take_profit: Optional[float] = None) -> Dict[str, Any]:
         """Place a market order with optional leverage and SL/TP"""
         try:
-            # Set leverage if provided
-            if leverage and leverage > 0:
-                leverage_result = self.set_leverage(symbol, leverage)
-                if not leverage_result["success"]:
-                    return leverage_result
+            # Set leverage if provided and different from the current one
+            leverage_result = await self.ensure_leverage(symbol, leverage)
+            if not leverage_result["success"]:
+                return leverage_result
             
             # Place market order
             order_params = {
                 "category": "linear",
-                "symbol": symbol,
-                "side": side.capitalize(),
-                "orderType": "Market",
-                "qty": str(qty),
-                "timeInForce": "IOC",
-                "positionIdx": 0  # One-way mode
+                **self.build_order_params(symbol, side, qty, stop_loss, take_profit)
             }
-            print("$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$")
-            print(f"Placing order with params: {order_params}")
-            print("$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$")
-
-            # Add SL/TP if provided
-            if stop_loss:
-                order_params["stopLoss"] = str(stop_loss)
-            if take_profit:
-                order_params["takeProfit"] = str(take_profit)
+            logger.debug("Placing order", extra={"params": order_params})
             
-            result = self.session.place_order(**order_params)
+            result = await self._request("POST", "/v5/order/create", order_params)
             
             if result["retCode"] == 0:
                 return {
@@ -129,86 +295,173 @@ class BybitClient:
                 "error": str(e)
             }
     
-    def set_leverage(self, symbol: str, leverage: int) -> Dict[str, Any]:
+    async def place_batch_orders(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Place many orders via create-batch, BATCH_ORDER_LIMIT per call.
+        
+        Batches are sent concurrently. Returns one result per order, in the
+        order given.
+        """
+        limit = config.BATCH_ORDER_LIMIT
+        chunks = [orders[i:i + limit] for i in range(0, len(orders), limit)]
+        results = await asyncio.gather(*(self._place_batch(chunk) for chunk in chunks))
+        return [result for chunk_results in results for result in chunk_results]
+    
+    async def _place_batch(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        try:
+            result = await self._request("POST", "/v5/order/create-batch", {
+                "category": "linear",
+                "request": orders
+            })
+        except Exception as e:
+            return [{"success": False, "error": str(e)} for _ in orders]
+        
+        if result["retCode"] != 0:
+            error = result.get("retMsg", "Batch order placement failed")
+            return [{"success": False, "error": error} for _ in orders]
+        
+        # result.list and retExtInfo.list are parallel to the request list
+        placed = result["result"].get("list", [])
+        statuses = result.get("retExtInfo", {}).get("list", [])
+        results = []
+        for i in range(len(orders)):
+            status = statuses[i] if i < len(statuses) else {"code": -1, "msg": "Missing result"}
+            if status.get("code") == 0 and i < len(placed):
+                results.append({
+                    "success": True,
+                    "order_id": placed[i]["orderId"],
+                    "data": placed[i]
+                })
+            else:
+                results.append({
+                    "success": False,
+                    "error": status.get("msg") or "Order placement failed"
+                })
+        return results
+    
+    async def set_leverage(self, symbol: str, leverage: int) -> Dict[str, Any]:
         """Set leverage for a symbol"""
         try:
-            result = self.session.set_leverage(
-                category="linear",
-                symbol=symbol,
-                buyLeverage=str(leverage),
-                sellLeverage=str(leverage)
-            )
+            result = await self._request("POST", "/v5/position/set-leverage", {
+                "category": "linear",
+                "symbol": symbol,
+                "buyLeverage": str(leverage),
+                "sellLeverage": str(leverage)
+            })
             
             if result["retCode"] == 0:
+                self.leverage_cache[symbol] = float(leverage)
                 return {
                     "success": True,
                     "message": f"Leverage set to {leverage}x for {symbol}"
                 }
-            else:
-                return {
-                    "success": False,
-                    "error": result.get("retMsg", "Failed to set leverage")
-                }
-        except Exception as e:
-
-            if "leverage not modified" in str(e):
-            # Handle specific error code for leverage setting
+            elif result["retCode"] == LEVERAGE_NOT_MODIFIED:
+                self.leverage_cache[symbol] = float(leverage)
                 return {
                     "success": True,
-                    "message": "leverage already set to this valuel"
+                    "message": "leverage already set to this value"
                 }
             else:
                 return {
                     "success": False,
-                    "error": f"Error setting leverage: {str(e)}"
+                    "error": result.get("retMsg", "Failed to set leverage")
                 }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Error setting leverage: {str(e)}"
+            }
     
-    def get_positions(self) -> List[Dict[str, Any]]:
+    async def get_positions(self) -> List[Dict[str, Any]]:
         """Get all open positions"""
+        return await self.fetch_positions() or []
+    
+    async def fetch_positions(self) -> Optional[List[Dict[str, Any]]]:
+        """Get all open positions, or None if the request failed"""
         try:
-            result = self.session.get_positions(
-                category="linear",
-                settleCoin="USDT"
-            )
+            result = await self._request("GET", "/v5/position/list", {
+                "category": "linear",
+                "settleCoin": "USDT"
+            })
             
             if result["retCode"] == 0:
                 positions = []
                 for pos in result["result"]["list"]:
-                    if float(pos.get("size", 0)) > 0:
-                        entry_price = float(pos.get("avgPrice"))
-                        current_price = float(pos.get("markPrice", entry_price))
-                        pnl = float(pos.get("unrealisedPnl", 0))
-                        leverage = float(pos.get("leverage", 1))
-                        position_value = float(pos.get("positionValue", 0))
-                        #calculate margin used
-                        margin_used = position_value / leverage if leverage > 0 else position_value
-                        # Calculate PnL percentage
-                        pnl_percentage = (pnl / margin_used) * 100 if margin_used > 0 else 0
-
-                        positions.append({
-                            "symbol": pos["symbol"],
-                            "side": pos["side"],
-                            "size": float(pos["size"]),
-                            "leverage": leverage,
-                            "entry_price": entry_price,
-                            "current_price": current_price,
-                            "pnl": pnl,
-                            "pnl_percentage": pnl_percentage,
-                        })
+                    if pos.get("leverage"):
+                        self.leverage_cache[pos["symbol"]] = float(pos["leverage"])
+                    position = parse_position(pos)
+                    if position:
+                        positions.append(position)
                 return positions
-            return []
+            logger.error("Error getting positions: %s", result.get("retMsg"))
+            return None
         except Exception as e:
-            print(f"Error getting positions: {e}")
-            return []
+            logger.error("Error getting positions: %s", e)
+            return None
+    
+    async def seed_leverage_cache(self):
+        """Load the current leverage of every USDT perpetual from the exchange"""
+        try:
+            params = {
+                "category": "linear",
+                "settleCoin": "USDT",
+                "limit": 200
+            }
+            while True:
+                result = await self._request("GET", "/v5/position/list", params)
+                if result["retCode"] != 0:
+                    logger.error("Error seeding leverage cache: %s", result.get("retMsg"))
+                    return
+                
+                for pos in result["result"]["list"]:
+                    if pos.get("leverage"):
+                        self.leverage_cache[pos["symbol"]] = float(pos["leverage"])
+                
+                cursor = result["result"].get("nextPageCursor")
+                if not cursor:
+                    break
+                params["cursor"] = cursor
+        except Exception as e:
+            logger.error("Error seeding leverage cache: %s", e)
+    
+    async def get_position(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Get the raw position entry for a single symbol"""
+        try:
+            result = await self._request("GET", "/v5/position/list", {
+                "category": "linear",
+                "symbol": symbol
+            })
+            
+            if result["retCode"] == 0 and result["result"]["list"]:
+                return result["result"]["list"][0]
+            return None
+        except Exception as e:
+            logger.error("Error getting position: %s", e, extra={"symbol": symbol})
+            return None
     
-    def cancel_order(self, symbol: str, order_id: str) -> Dict[str, Any]:
+    async def get_ticker_price(self, symbol: str) -> Optional[float]:
+        """Get the current mark price of a symbol (public ticker endpoint)"""
+        try:
+            result = await self._request("GET", "/v5/market/tickers", {
+                "category": "linear",
+                "symbol": symbol
+            })
+            
+            if result["retCode"] == 0 and result["result"]["list"]:
+                ticker = result["result"]["list"][0]
+                return float(ticker.get("markPrice") or ticker.get("lastPrice") or 0) or None
+            return None
+        except Exception as e:
+            logger.error("Error getting ticker: %s", e, extra={"symbol": symbol})
+            return None
+    
+    async def cancel_order(self, symbol: str, order_id: str) -> Dict[str, Any]:
         """Cancel an open order"""
         try:
-            result = self.session.cancel_order(
-                category="linear",
-                symbol=symbol,
-                orderId=order_id
-            )
+            result = await self._request("POST", "/v5/order/cancel", {
+                "category": "linear",
+                "symbol": symbol,
+                "orderId": order_id
+            })
             
             if result["retCode"] == 0:
                 return {
@@ -226,7 +479,36 @@ class BybitClient:
                 "error": str(e)
             }
     
-    def get_order_history(self, symbol: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    async def get_order(self, symbol: str, order_id: str) -> Optional[Dict[str, Any]]:
+        """Get a single order by ID, falling back to history once it is closed"""
+        try:
+            params = {
+                "category": "linear",
+                "symbol": symbol,
+                "orderId": order_id
+            }
+            for path in ("/v5/order/realtime", "/v5/order/history"):
+                result = await self._request("GET", path, params)
+                if result["retCode"] == 0 and result["result"]["list"]:
+                    return result["result"]["list"][0]
+            return None
+        except Exception as e:
+            logger.error("Error getting order: %s", e, extra={"order_id": order_id})
+            return None
+    
+    async def get_instruments_info(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Get one page of instrument rules (lot size, tick size, leverage)"""
+        return await self._request("GET", "/v5/market/instruments-info", params)
+    
+    async def get_order_history_page(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Get one page of order history (filters and cursor in params)"""
+        return await self._request("GET", "/v5/order/history", params)
+    
+    async def get_closed_pnl_page(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Get one page of closed-position PnL records"""
+        return await self._request("GET", "/v5/position/closed-pnl", params)
+    
+    async def get_order_history(self, symbol: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
         """Get order history"""
         try:
             params = {
@@ -236,13 +518,13 @@ class BybitClient:
             if symbol:
                 params["symbol"] = symbol
                 
-            result = self.session.get_order_history(**params)
+            result = await self._request("GET", "/v5/order/history", params)
             
             if result["retCode"] == 0:
                 return result["result"]["list"]
             return []
         except Exception as e:
-            print(f"Error getting order history: {e}")
+            logger.error("Error getting order history: %s", e)
             return []
 
 # Create a singleton instance
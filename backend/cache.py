@@ -0,0 +1,54 @@
+from typing import Any, Awaitable, Callable, Optional
+import asyncio
+import time
+
+class SingleFlightCache:
+    """Caches one async value for ``ttl`` seconds.
+
+    Concurrent callers that miss the cache share a single in-flight load
+    instead of each starting their own. Only values accepted by
+    ``should_cache`` are stored, so error responses are retried.
+    """
+
+    def __init__(self, loader: Callable[[], Awaitable[Any]], ttl: float,
+                 should_cache: Optional[Callable[[Any], bool]] = None):
+        self.loader = loader
+        self.ttl = ttl
+        self.should_cache = should_cache or (lambda value: True)
+        self._value: Any = None
+        self._loaded_at: Optional[float] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self._generation = 0
+
+    async def get(self) -> Any:
+        """Return the cached value, loading it if missing or expired"""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return self._value
+
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._load())
+        return await asyncio.shield(self._inflight)
+
+    def invalidate(self):
+        """Drop the cached value; the next get starts a fresh load.
+
+        Loads already in flight may predate the change, so their results
+        are neither stored nor shared with later callers.
+        """
+        self._generation += 1
+        self._loaded_at = None
+        self._value = None
+        self._inflight = None
+
+    async def _load(self) -> Any:
+        generation = self._generation
+        try:
+            value = await self.loader()
+            if generation == self._generation and self.should_cache(value):
+                self._value = value
+                self._loaded_at = time.monotonic()
+            return value
+        finally:
+            # A load started after an invalidate is not this one's to clear
+            if generation == self._generation:
+                self._inflight = None
@@ -0,0 +1,233 @@
+from fastapi import HTTPException
+from logger import get_logger, correlation_id
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from contextlib import contextmanager
+from config import config
+import asyncio
+import fcntl
+import json
+import os
+
+logger = get_logger(__name__)
+
+ROLE_SINGLE = "single"
+ROLE_LEADER = "leader"
+ROLE_FOLLOWER = "follower"
+
+# Largest IPC message (webhook bodies, position lists, metrics text)
+IPC_LIMIT = 16 * 1024 * 1024
+
+@contextmanager
+def file_lock(path: str):
+    """Hold an exclusive lock on a file, blocking until it is free"""
+    with open(path, "a") as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+class LeaderLock:
+    """Non-blocking exclusive lock; the OS releases it if the holder dies"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def try_acquire(self) -> bool:
+        if self._file is not None:
+            return True
+        file = open(self.path, "a")
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            file.close()
+            return False
+        self._file = file
+        return True
+
+    def release(self):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+class Cluster:
+    """Leader election and a local IPC channel for multi-worker mode.
+
+    Every worker competes for a file lock. The holder is the leader: it
+    alone runs order execution, exchange streams and the other background
+    services, and serves their state over a unix socket. The other workers
+    are followers: they serve database reads themselves, call the leader
+    for anything that touches the exchange or in-memory state, and relay
+    the leader's dashboard events to their own WebSocket clients. A
+    follower takes over when the leader's lock is released.
+
+    With a single worker the role is "single" and nothing is shared.
+    """
+
+    def __init__(self, workers: int, lock_path: str, socket_path: str, poll_interval: float):
+        self.enabled = workers > 1
+        self.role = ROLE_FOLLOWER if self.enabled else ROLE_SINGLE
+        self.lock = LeaderLock(lock_path)
+        self.socket_path = socket_path
+        self.poll_interval = poll_interval
+        self.ops: Dict[str, Callable[..., Awaitable[Any]]] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._subscribers: Set[asyncio.StreamWriter] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def is_follower(self) -> bool:
+        return self.role == ROLE_FOLLOWER
+
+    def operation(self, name: str):
+        """Decorator exposing a coroutine to followers as an IPC operation"""
+        def register(handler: Callable[..., Awaitable[Any]]):
+            self.ops[name] = handler
+            return handler
+        return register
+
+    async def run(self, op: str, **args) -> Any:
+        """Run an operation where the state lives: here, or on the leader.
+
+        Arguments and results cross the socket as JSON on followers, so
+        operations take and return plain values only.
+        """
+        if self.is_follower:
+            return await self.call(op, **args)
+        return await self.ops[op](**args)
+
+    async def start(self, on_promote: Callable[[], Awaitable[None]],
+                    on_event: Callable[[Dict[str, Any]], None]):
+        """Become leader if the lock is free, otherwise follow and keep trying"""
+        if not self.enabled:
+            await on_promote()
+            return
+        if await self._try_promote(on_promote):
+            return
+        logger.info("Running as follower", extra={"pid": os.getpid()})
+        self._spawn(self._follow(on_promote, on_event))
+
+    async def stop(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._subscribers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+        self.lock.release()
+
+    async def call(self, op: str, **args) -> Any:
+        """Run an operation on the leader; raises HTTPException on failure"""
+        try:
+            reader, writer = await asyncio.open_unix_connection(self.socket_path, limit=IPC_LIMIT)
+        except OSError:
+            raise HTTPException(status_code=503, detail="Leader process unavailable")
+        try:
+            request = {"op": op, "args": args, "correlation_id": correlation_id.get()}
+            writer.write(json.dumps(request, default=str).encode() + b"\n")
+            await writer.drain()
+            line = await reader.readline()
+        finally:
+            writer.close()
+        if not line:
+            raise HTTPException(status_code=503, detail="Leader process unavailable")
+
+        response = json.loads(line)
+        if not response["ok"]:
+            raise HTTPException(status_code=response.get("status", 500), detail=response.get("detail"))
+        return response["result"]
+
+    def publish(self, message: Dict[str, Any]):
+        """Send an event to every subscribed follower (leader only)"""
+        if not self._subscribers:
+            return
+        data = json.dumps(message, default=str).encode() + b"\n"
+        for writer in list(self._subscribers):
+            if writer.is_closing():
+                self._subscribers.discard(writer)
+            else:
+                writer.write(data)
+
+    async def _try_promote(self, on_promote: Callable[[], Awaitable[None]]) -> bool:
+        if not self.lock.try_acquire():
+            return False
+        self.role = ROLE_LEADER
+        logger.info("Running as leader", extra={"pid": os.getpid()})
+        await on_promote()
+        # Holding the lock means any socket file left behind is stale
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        self._server = await asyncio.start_unix_server(self._serve, self.socket_path, limit=IPC_LIMIT)
+        return True
+
+    async def _follow(self, on_promote, on_event):
+        """Relay leader events until the lock can be taken over"""
+        relay = self._spawn(self._subscribe(on_event))
+        while not await self._try_promote(on_promote):
+            await asyncio.sleep(self.poll_interval)
+        relay.cancel()
+
+    async def _subscribe(self, on_event: Callable[[Dict[str, Any]], None]):
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.socket_path, limit=IPC_LIMIT)
+                writer.write(json.dumps({"op": "subscribe"}).encode() + b"\n")
+                await writer.drain()
+                while line := await reader.readline():
+                    on_event(json.loads(line))
+            except (OSError, ValueError):
+                pass
+            await asyncio.sleep(self.poll_interval)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            line = await reader.readline()
+            if not line:
+                return
+            request = json.loads(line)
+            if request["op"] == "subscribe":
+                self._subscribers.add(writer)
+                # Held open until the follower goes away
+                await reader.read()
+                return
+
+            token = correlation_id.set(request.get("correlation_id"))
+            try:
+                handler = self.ops[request["op"]]
+                response = {"ok": True, "result": await handler(**request.get("args", {}))}
+            except HTTPException as e:
+                response = {"ok": False, "status": e.status_code, "detail": e.detail}
+            except Exception as e:
+                logger.exception("IPC operation failed", extra={"op": request.get("op")})
+                response = {"ok": False, "status": 500, "detail": str(e)}
+            finally:
+                correlation_id.reset(token)
+            writer.write(json.dumps(response, default=str).encode() + b"\n")
+            await writer.drain()
+        finally:
+            self._subscribers.discard(writer)
+            writer.close()
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+cluster = Cluster(
+    config.WORKERS,
+    config.LEADER_LOCK_PATH,
+    config.IPC_SOCKET_PATH,
+    config.LEADER_POLL_INTERVAL
+)
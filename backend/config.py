@@ -8,6 +8,8 @@ class Config:
     BYBIT_API_KEY = os.getenv("BYBIT_API_KEY")
     BYBIT_API_SECRET = os.getenv("BYBIT_API_SECRET")
     BYBIT_TESTNET = os.getenv("BYBIT_TESTNET", "True").lower() == "true"
+    # REST endpoint override, e.g. a local exchange simulator
+    BYBIT_BASE_URL = os.getenv("BYBIT_BASE_URL")
     
     # Webhook Security
     WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
@@ -19,9 +21,68 @@ class Config:
     HOST = os.getenv("HOST", "0.0.0.0")
     PORT = int(os.getenv("PORT", 8000))
     
+    # Private stream; override to point at a local mock server
+    BYBIT_WS_PRIVATE_URL = os.getenv("BYBIT_WS_PRIVATE_URL")
+    POSITION_RECONCILE_INTERVAL = float(os.getenv("POSITION_RECONCILE_INTERVAL", 60.0))
+    # Without the stream, fills trigger at most one REST reload per this many seconds
+    POSITION_RECONCILE_DEBOUNCE = float(os.getenv("POSITION_RECONCILE_DEBOUNCE", 2.0))
+    
+    # Public ticker stream; symbols stay subscribed this long after a signal
+    BYBIT_WS_PUBLIC_URL = os.getenv("BYBIT_WS_PUBLIC_URL")
+    TICKER_SIGNAL_TTL = float(os.getenv("TICKER_SIGNAL_TTL", 900.0))
+    
+    # Exchange state caching (seconds)
+    ACCOUNT_STATE_TTL = float(os.getenv("ACCOUNT_STATE_TTL", 3.0))
+    
+    DASHBOARD_REFRESH_INTERVAL = float(os.getenv("DASHBOARD_REFRESH_INTERVAL", 3.0))
+    
+    # Instrument rules (lot/tick size, leverage limits) cached on disk
+    INSTRUMENTS_CACHE_PATH = os.getenv("INSTRUMENTS_CACHE_PATH", "instruments_cache.json")
+    INSTRUMENTS_REFRESH_INTERVAL = float(os.getenv("INSTRUMENTS_REFRESH_INTERVAL", 6 * 3600))
+    
+    # Webhook order execution
+    ORDER_WORKERS = int(os.getenv("ORDER_WORKERS", 4))
+    ORDER_QUEUE_SIZE = int(os.getenv("ORDER_QUEUE_SIZE", 1000))
+    BATCH_ORDER_LIMIT = int(os.getenv("BATCH_ORDER_LIMIT", 10))  # orders per create-batch call
+    
+    # Extra accounts (names in config.json) that every single-leg signal is copied to
+    ACCOUNTS_CONFIG_PATH = os.getenv(
+        "ACCOUNTS_CONFIG_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config.json")
+    )
+    FANOUT_ACCOUNTS = [name.strip() for name in os.getenv("FANOUT_ACCOUNTS", "").split(",") if name.strip()]
+    
+    # Webhook deduplication (seconds / entries)
+    DEDUP_WINDOW = int(os.getenv("DEDUP_WINDOW", 60))
+    DEDUP_TTL = float(os.getenv("DEDUP_TTL", 300))
+    DEDUP_CACHE_SIZE = int(os.getenv("DEDUP_CACHE_SIZE", 10000))
+    
+    # Trade reconciliation against order history and closed PnL (seconds)
+    TRADE_RECONCILE_INTERVAL = float(os.getenv("TRADE_RECONCILE_INTERVAL", 60.0))
+    TRADE_RECONCILE_OVERLAP = float(os.getenv("TRADE_RECONCILE_OVERLAP", 300.0))
+    
+    # Append-only log of recorded signals for replay; empty disables it
+    SIGNAL_JOURNAL_PATH = os.getenv("SIGNAL_JOURNAL_PATH", "signals.jsonl")
+
+    # Rows per chunk (and Parquet row group) for trade history exports
+    EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 5000))
+    
+    # Server worker processes; with more than one, the worker holding the
+    # leader lock executes orders and the others call it over the socket
+    WORKERS = int(os.getenv("WORKERS", 1))
+    LEADER_LOCK_PATH = os.getenv("LEADER_LOCK_PATH", "trading_system.leader.lock")
+    IPC_SOCKET_PATH = os.getenv("IPC_SOCKET_PATH", "trading_system.sock")
+    LEADER_POLL_INTERVAL = float(os.getenv("LEADER_POLL_INTERVAL", 2.0))
+
+    # Logging; records below WARNING are kept at the given rates
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "DEBUG=0.1")
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+    
     # Trading Settings
     DEFAULT_POSITION_SIZE = 100  # USDT
-    MAX_POSITIONS = 5
+    MAX_POSITIONS = int(os.getenv("MAX_POSITIONS", 5))
+    MAX_GROSS_EXPOSURE = float(os.getenv("MAX_GROSS_EXPOSURE", 0))  # USDT across symbols, 0 = no limit
     
     # Risk Management
     DEFAULT_STOP_LOSS_PERCENT = 2.0  # 2% stop loss
@@ -0,0 +1,137 @@
+from fastapi import WebSocket
+from models import Trade, TradeResponse
+from bybit_client import bybit_client
+from position_book import position_book
+from typing import Dict, Any, Optional, Set
+from config import config
+from logger import get_logger
+from cluster import cluster
+import asyncio
+
+logger = get_logger(__name__)
+
+class DashboardHub:
+    """Fans out one shared live state stream to every open dashboard.
+
+    A single poller refreshes balance and reads positions from the local
+    position book while at least one client is connected, so exchange
+    traffic does not grow with the number of open tabs. Clients receive a snapshot on connect and deltas after.
+
+    In a follower worker the state is read from the leader instead, and
+    trade events arrive through ``relay``.
+    """
+
+    def __init__(self, interval: float):
+        self.client = bybit_client
+        self.interval = interval
+        self.clients: Set[WebSocket] = set()
+        self.positions: Dict[str, Dict[str, Any]] = {}
+        self.account: Optional[Dict[str, Any]] = None
+        self._poller: Optional[asyncio.Task] = None
+        self._sends: Set[asyncio.Task] = set()
+        self._start_lock = asyncio.Lock()
+
+    async def connect(self, websocket: WebSocket):
+        """Register a client and send it the current state"""
+        await websocket.accept()
+        async with self._start_lock:
+            if self._poller is None or self._poller.done():
+                # Fetch once up front so the first client gets real data
+                try:
+                    await self._refresh()
+                except Exception as e:
+                    logger.warning("Dashboard refresh failed: %s", e)
+                self._poller = asyncio.create_task(self._poll())
+
+        self.clients.add(websocket)
+        await websocket.send_json({
+            "type": "snapshot",
+            "account": self.account,
+            "positions": list(self.positions.values())
+        })
+
+    def disconnect(self, websocket: WebSocket):
+        self.clients.discard(websocket)
+
+    def publish_trade(self, trade: Trade):
+        """Push a new or updated trade row to all clients, in every worker"""
+        if not self.clients and not cluster.enabled:
+            return
+        message = {
+            "type": "trade",
+            "trade": TradeResponse.model_validate(trade).model_dump(mode="json")
+        }
+        cluster.publish(message)
+        self.relay(message)
+
+    def relay(self, message: Dict[str, Any]):
+        """Push a message to this worker's clients"""
+        if not self.clients:
+            return
+        task = asyncio.create_task(self._broadcast(message))
+        self._sends.add(task)
+        task.add_done_callback(self._sends.discard)
+
+    async def stop(self):
+        if self._poller:
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
+        for websocket in list(self.clients):
+            await websocket.close()
+        self.clients.clear()
+
+    async def _poll(self):
+        """Refresh shared state and broadcast deltas until nobody listens"""
+        while self.clients:
+            await asyncio.sleep(self.interval)
+            try:
+                for message in await self._refresh():
+                    await self._broadcast(message)
+            except Exception as e:
+                logger.warning("Dashboard refresh failed: %s", e)
+
+    async def current_state(self) -> Dict[str, Any]:
+        """Balance from the exchange and positions from the position book"""
+        account = {"connected": False}
+        connection = await self.client.check_connection()
+        if connection["connected"]:
+            account_info = await self.client.get_account_info()
+            if account_info["success"]:
+                account = {
+                    "connected": True,
+                    "balance": account_info["balance"],
+                    "equity": account_info["equity"],
+                    "available_balance": account_info["available_balance"]
+                }
+        return {"account": account, "positions": await position_book.get_positions()}
+
+    async def _refresh(self) -> list:
+        """Update the shared state and return the delta messages"""
+        messages = []
+
+        state = await cluster.run("dashboard_state")
+        account = state["account"]
+        if account != self.account:
+            self.account = account
+            messages.append({"type": "account", **account})
+
+        positions = {pos["symbol"]: pos for pos in state["positions"]}
+        upsert = [pos for symbol, pos in positions.items() if self.positions.get(symbol) != pos]
+        remove = [symbol for symbol in self.positions if symbol not in positions]
+        self.positions = positions
+        if upsert or remove:
+            messages.append({"type": "positions", "upsert": upsert, "remove": remove})
+
+        return messages
+
+    async def _broadcast(self, message: Dict[str, Any]):
+        clients = list(self.clients)
+        results = await asyncio.gather(
+            *(asyncio.wait_for(ws.send_json(message), 5) for ws in clients),
+            return_exceptions=True
+        )
+        for websocket, result in zip(clients, results):
+            if isinstance(result, Exception):
+                self.clients.discard(websocket)
+
+dashboard_hub = DashboardHub(config.DASHBOARD_REFRESH_INTERVAL)
@@ -1,7 +1,12 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from models import Base, Settings
+from settings_store import settings_store
+import asyncio
+import logging
 import os
 from dotenv import load_dotenv
 
@@ -15,10 +20,64 @@ if DATABASE_URL.startswith("sqlite"):
 else:
     ASYNC_DATABASE_URL = DATABASE_URL
 
+# "production" tunes file-backed SQLite; "default" keeps driver defaults
+DATABASE_PROFILE = os.getenv("DATABASE_PROFILE", "production")
+DATABASE_ECHO = os.getenv("DATABASE_ECHO", "False").lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+
+# Applied to every new SQLite connection in the production profile
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",  # readers no longer block on the writer
+    "synchronous": "NORMAL",  # fsync at checkpoints only, safe with WAL
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+    "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", 64 * 1024)),
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+
+def create_engine_for(url: str, profile: str = DATABASE_PROFILE, echo: bool = DATABASE_ECHO):
+    """Create the async engine for a database URL and profile"""
+    if echo:
+        # Through the app's log pipeline rather than echo's own stdout handler
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+    url_info = make_url(url)
+    is_sqlite_file = (
+        url_info.get_backend_name() == "sqlite"
+        and url_info.database not in (None, "", ":memory:")
+    )
+    if profile != "production" or not is_sqlite_file:
+        return create_async_engine(url)
+    
+    # aiosqlite defaults to NullPool, which opens a connection (and a
+    # thread) per session; keep a pool of warm connections instead
+    engine = create_async_engine(
+        url,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        connect_args={"timeout": 30}
+    )
+    
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    
+    return engine
+
 # Create async engine
-engine = create_async_engine(ASYNC_DATABASE_URL, echo=True)
+engine = create_engine_for(ASYNC_DATABASE_URL)
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# SQLite has one writer at a time, and a connection that finds the write
+# lock taken sleeps in growing steps (busy_timeout) before trying again.
+# Hot write paths take this lock around their commit to queue for the
+# database lock in process instead.
+write_lock = asyncio.Lock()
+
 # Initialize database
 async def init_db():
     async with engine.begin() as conn:
@@ -36,6 +95,10 @@ async def init_db():
             )
             session.add(default_settings)
             await session.commit()
+            settings = default_settings
+        
+        # Keep settings in memory so request handlers never query them
+        settings_store.load(settings)
 
 # Dependency to get database session
 async def get_db():
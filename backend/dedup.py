@@ -0,0 +1,76 @@
+from models import WebhookSignal, BatchWebhookSignal
+from collections import OrderedDict
+from typing import Optional, Union
+from config import config
+import hashlib
+import json
+import time
+
+class DedupIndex:
+    """In-memory LRU of recently seen webhook idempotency keys.
+
+    Keys expire after ``ttl`` seconds. The unique ``trades.idempotency_key``
+    column backs this index across restarts and evictions.
+    """
+
+    def __init__(self, window: int, ttl: float, max_size: int):
+        self.window = window
+        self.ttl = ttl
+        self.max_size = max_size
+        self.suppressed = 0
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+
+    def key_for(self, signal: Union[WebhookSignal, BatchWebhookSignal],
+                now: Optional[float] = None) -> str:
+        """Client key if supplied, else a hash of the signal and its time bucket"""
+        if signal.idempotency_key:
+            return f"client:{signal.idempotency_key}"
+
+        if isinstance(signal, BatchWebhookSignal):
+            fields = {
+                "alert_message": signal.alert_message,
+                "legs": [self._normalize(leg) for leg in signal.legs]
+            }
+        else:
+            fields = self._normalize(signal)
+        bucket = int((now or time.time()) // self.window)
+        normalized = json.dumps(fields, sort_keys=True, separators=(",", ":"))
+        digest = hashlib.sha256(f"{normalized}|{bucket}".encode()).hexdigest()
+        return f"sig:{digest}"
+
+    def _normalize(self, signal: WebhookSignal) -> dict:
+        fields = signal.model_dump(exclude={"idempotency_key"})
+        fields["symbol"] = fields["symbol"].upper()
+        fields["action"] = fields["action"].lower()
+        return fields
+
+    def claim(self, key: str) -> bool:
+        """Reserve a key; returns False (and counts it) if it is a duplicate"""
+        now = time.monotonic()
+        seen_at = self._seen.get(key)
+        if seen_at is not None and now - seen_at < self.ttl:
+            self._seen.move_to_end(key)
+            self.suppressed += 1
+            return False
+
+        self._seen[key] = now
+        self._seen.move_to_end(key)
+        while len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+        return True
+
+    def release(self, key: str):
+        """Forget a key whose signal was not recorded"""
+        self._seen.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "duplicates_suppressed": self.suppressed,
+            "tracked_keys": len(self._seen)
+        }
+
+dedup_index = DedupIndex(
+    window=config.DEDUP_WINDOW,
+    ttl=config.DEDUP_TTL,
+    max_size=config.DEDUP_CACHE_SIZE
+)
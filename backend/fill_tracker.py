@@ -0,0 +1,184 @@
+from bybit_client import bybit_client
+from accounts import account_registry
+from database import async_session_maker, write_lock
+from models import Trade
+from dashboard import dashboard_hub
+from logger import get_logger
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Set
+import asyncio
+import time
+import metrics
+
+logger = get_logger(__name__)
+
+# Order states after which Bybit will not fill the order any further
+FINAL_ORDER_STATES = {
+    "Filled", "PartiallyFilledCanceled", "Cancelled", "Rejected", "Deactivated"
+}
+
+def apply_order_update(trade: Trade, order: Dict[str, Any]) -> bool:
+    """Copy a final order state onto its trade row; returns whether it changed"""
+    status = order["orderStatus"]
+    filled_qty = float(order.get("cumExecQty") or 0)
+
+    if filled_qty > 0:
+        values = {
+            "status": "filled",
+            "quantity": filled_qty,
+            "entry_price": float(order.get("avgPrice") or 0),
+            "reason": "Order filled"
+        }
+    elif status == "Rejected":
+        values = {
+            "status": "rejected",
+            "reason": f"Order rejected: {order.get('rejectReason', 'Unknown reason')}"
+        }
+    else:
+        values = {
+            "status": "cancelled",
+            "reason": f"Order {status.lower()} without fill"
+        }
+
+    changed = False
+    for field, value in values.items():
+        if getattr(trade, field) != value:
+            setattr(trade, field, value)
+            changed = True
+    return changed
+
+class FillTracker:
+    """Confirms order fills in the background and updates the trade row.
+
+    The v5 create-order response only carries the order ID, so the fill is
+    confirmed either by an order update pushed through ``notify`` (private
+    stream) or, as a fallback, by polling the order with bounded backoff.
+    """
+
+    def __init__(self):
+        self.client = bybit_client
+        self.poll_delays = (0.2, 0.4, 0.8, 1.6, 3.2)
+        self._waiters: Dict[str, asyncio.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        # Final updates that arrived before the order was tracked
+        self._early: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._early_limit = 1000
+
+    def track(self, trade_id: int, order_id: str, symbol: str, account=None):
+        """Start confirming an accepted order without blocking the caller.
+
+        ``account`` is the fan-out account the order went to (None for the
+        primary); its orders are not on the private stream and are polled.
+        """
+        future = asyncio.get_running_loop().create_future()
+        early = self._early.pop(order_id, None)
+        if early:
+            future.set_result(early)
+        self._waiters[order_id] = future
+
+        task = asyncio.create_task(self._confirm(trade_id, order_id, symbol, future, account))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def notify(self, order: Dict[str, Any]):
+        """Feed an order update (e.g. from the private order stream)"""
+        if order.get("orderStatus") not in FINAL_ORDER_STATES:
+            return
+
+        order_id = order.get("orderId")
+        future = self._waiters.get(order_id)
+        if future is None:
+            self._early[order_id] = order
+            if len(self._early) > self._early_limit:
+                self._early.popitem(last=False)
+        elif not future.done():
+            future.set_result(order)
+
+    def pending(self) -> int:
+        """Number of orders still awaiting confirmation"""
+        return len(self._tasks)
+
+    async def drain(self):
+        """Wait until every outstanding confirmation has finished"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def stop(self):
+        """Cancel outstanding confirmations"""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _confirm(self, trade_id: int, order_id: str, symbol: str,
+                       future: asyncio.Future, account=None):
+        client = account.client if account else self.client
+        start = time.perf_counter()
+        try:
+            order = await self._wait_for_order(client, order_id, symbol, future)
+        finally:
+            self._waiters.pop(order_id, None)
+        metrics.webhook_stage_seconds.observe(time.perf_counter() - start, stage="fill_lookup")
+
+        try:
+            await self._apply(trade_id, order, account)
+        except Exception as e:
+            logger.exception("Error updating trade from order",
+                             extra={"trade_id": trade_id, "order_id": order_id})
+        finally:
+            # The position book now carries the fill (or the periodic
+            # reconcile will), so the risk reservation can go
+            (account or account_registry.primary).risk.release(trade_id)
+
+    async def _wait_for_order(self, client, order_id: str, symbol: str,
+                              future: asyncio.Future) -> Optional[Dict[str, Any]]:
+        """Wait for a pushed update, polling REST between waits"""
+        for delay in self.poll_delays:
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), delay)
+            except asyncio.TimeoutError:
+                pass
+
+            order = await client.get_order(symbol, order_id)
+            if order and order.get("orderStatus") in FINAL_ORDER_STATES:
+                return order
+        return None
+
+    async def _apply(self, trade_id: int, order: Optional[Dict[str, Any]], account=None):
+        """Write the confirmed execution to the trade row"""
+        async with async_session_maker() as session:
+            trade = await session.get(Trade, trade_id)
+            if not trade:
+                return
+
+            if order is None:
+                # The trade reconciler picks it up from the order history
+                trade.reason = "Order placed, fill not confirmed"
+            else:
+                apply_order_update(trade, order)
+
+            async with write_lock:
+                with metrics.db_commit_seconds.time(site="fill"):
+                    await session.commit()
+            logger.info("Trade %s: %s", trade.status, trade.reason, extra={
+                "trade_id": trade.id,
+                "order_id": trade.trade_id,
+                "account": trade.account,
+                "symbol": trade.symbol
+            })
+            metrics.account_fills_total.inc(
+                account=(account or account_registry.primary).name,
+                status=trade.status if order is not None else "unconfirmed"
+            )
+            dashboard_hub.publish_trade(trade)
+
+        if order is not None and trade.status == "filled":
+            (account.client if account else self.client).invalidate_account_state()
+            # Without the private stream (never for fan-out accounts) the
+            # book only learns of fills here; apply the fill now and confirm
+            # it with a debounced REST reload
+            book = (account or account_registry.primary).risk.book
+            if not book.live:
+                book.apply_fill(trade.symbol, trade.side, trade.quantity, trade.entry_price)
+                book.request_reconcile()
+
+fill_tracker = FillTracker()
@@ -0,0 +1,83 @@
+from database import async_session_maker, write_lock
+from sqlalchemy import inspect
+from typing import Any, List, Optional, Tuple
+import asyncio
+import metrics
+
+class GroupCommitWriter:
+    """Commits ORM rows for many concurrent callers in shared transactions.
+
+    Callers queue their rows and wait. A single flush task writes everything
+    queued so far in one session and commits once; rows queued meanwhile go
+    in the next commit. Under load one commit carries many requests, and the
+    SQLite write lock is taken by one connection in turn instead of being
+    contended for by every request. If a shared commit fails (e.g. on a
+    duplicate idempotency key), every caller's rows are retried in a
+    transaction of their own, so only the offending caller gets the error.
+    """
+
+    def __init__(self, site: str):
+        self.site = site
+        self._pending: List[Tuple[List[Any], asyncio.Future]] = []
+        self._task: Optional[asyncio.Task] = None
+        self.commits = 0
+        self.writes = 0
+
+    async def write(self, rows: List[Any]):
+        """Add (or update) rows; returns once they are committed"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((rows, future))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush())
+        await future
+
+    def stats(self):
+        return {
+            "commits": self.commits,
+            "writes": self.writes,
+            "writes_per_commit": self.writes / self.commits if self.commits else 0.0
+        }
+
+    async def _flush(self):
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                await self._commit([row for rows, _ in batch for row in rows], len(batch))
+                errors = [None] * len(batch)
+            except Exception as e:
+                if len(batch) == 1:
+                    errors = [e]
+                else:
+                    errors = [await self._commit_alone(rows) for rows, _ in batch]
+            for (_, future), error in zip(batch, errors):
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+    async def _commit(self, rows: List[Any], writes: int):
+        async with async_session_maker() as session:
+            session.add_all(rows)
+            async with write_lock:
+                with metrics.db_commit_seconds.time(site=self.site):
+                    await session.commit()
+        self.commits += 1
+        self.writes += writes
+
+    async def _commit_alone(self, rows: List[Any]) -> Optional[Exception]:
+        # Inserts rolled back with the shared commit keep the ids they were given
+        for row in rows:
+            state = inspect(row)
+            if state.transient:
+                for column in state.mapper.primary_key:
+                    setattr(row, column.key, None)
+        try:
+            await self._commit(rows, 1)
+        except Exception as e:
+            return e
+        return None
+
+# Trade rows recorded on the webhook path
+trade_writer = GroupCommitWriter(site="record")
@@ -0,0 +1,195 @@
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP
+from typing import Dict, Any, Optional
+from config import config
+from logger import get_logger
+import asyncio
+import json
+import os
+import time
+
+logger = get_logger(__name__)
+
+class InstrumentSpec:
+    """Trading rules for one linear contract"""
+    __slots__ = ("qty_step", "min_qty", "max_qty", "min_notional",
+                 "tick_size", "min_leverage", "max_leverage")
+
+    FIELDS = __slots__
+
+    def __init__(self, **values: str):
+        for field in self.FIELDS:
+            setattr(self, field, Decimal(values.get(field) or "0"))
+
+    @classmethod
+    def from_api(cls, info: Dict[str, Any]) -> "InstrumentSpec":
+        lot = info.get("lotSizeFilter", {})
+        price = info.get("priceFilter", {})
+        leverage = info.get("leverageFilter", {})
+        return cls(
+            qty_step=lot.get("qtyStep"),
+            min_qty=lot.get("minOrderQty"),
+            # Market orders have their own, lower, maximum
+            max_qty=lot.get("maxMktOrderQty") or lot.get("maxOrderQty"),
+            min_notional=lot.get("minNotionalValue"),
+            tick_size=price.get("tickSize"),
+            min_leverage=leverage.get("minLeverage"),
+            max_leverage=leverage.get("maxLeverage")
+        )
+
+    def to_dict(self) -> Dict[str, str]:
+        return {field: str(getattr(self, field)) for field in self.FIELDS}
+
+def _round_to_step(value: float, step: Decimal, rounding: str) -> Decimal:
+    if step <= 0:
+        return Decimal(str(value))
+    return (Decimal(str(value)) / step).to_integral_value(rounding=rounding) * step
+
+class InstrumentCache:
+    """Instrument rules for linear contracts, persisted to disk.
+
+    Loaded from disk at startup and refreshed from the exchange in the
+    background, so quantities and prices can be rounded and checked
+    before an order is sent.
+    """
+
+    def __init__(self, path: str, refresh_interval: float):
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.specs: Dict[str, InstrumentSpec] = {}
+        self.updated_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def get(self, symbol: str) -> Optional[InstrumentSpec]:
+        return self.specs.get(symbol)
+
+    def load_from_disk(self) -> bool:
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+            self.specs = {
+                symbol: InstrumentSpec(**values)
+                for symbol, values in data["instruments"].items()
+            }
+            self.updated_at = data.get("updated_at", 0.0)
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning("Ignoring unreadable instruments cache %s: %s", self.path, e)
+            return False
+
+    def save_to_disk(self):
+        data = {
+            "updated_at": self.updated_at,
+            "instruments": {symbol: spec.to_dict() for symbol, spec in self.specs.items()}
+        }
+        # Write then rename, so a crash never leaves a truncated file
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(data, file)
+        os.replace(tmp_path, self.path)
+
+    async def refresh(self, client) -> bool:
+        """Reload every linear instrument from the exchange"""
+        specs = {}
+        params = {"category": "linear", "limit": 1000}
+        while True:
+            result = await client.get_instruments_info(params)
+            if result["retCode"] != 0:
+                logger.error("Error loading instruments: %s", result.get("retMsg"))
+                return False
+            for info in result["result"]["list"]:
+                specs[info["symbol"]] = InstrumentSpec.from_api(info)
+            cursor = result["result"].get("nextPageCursor")
+            if not cursor:
+                break
+            params["cursor"] = cursor
+
+        self.specs = specs
+        self.updated_at = time.time()
+        self.save_to_disk()
+        return True
+
+    def start(self, client):
+        """Load the disk copy and keep refreshing in the background"""
+        self.load_from_disk()
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop(client))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _refresh_loop(self, client):
+        while True:
+            age = time.time() - self.updated_at
+            if age >= self.refresh_interval:
+                try:
+                    ok = await self.refresh(client)
+                except Exception as e:
+                    logger.error("Error refreshing instruments: %s", e)
+                    ok = False
+                # Retry failures sooner than the normal interval
+                await asyncio.sleep(self.refresh_interval if ok else 60)
+            else:
+                await asyncio.sleep(self.refresh_interval - age)
+
+    def prepare_order(self, symbol: str, qty: float,
+                      price: Optional[float] = None,
+                      leverage: Optional[int] = None,
+                      stop_loss: Optional[float] = None,
+                      take_profit: Optional[float] = None) -> Dict[str, Any]:
+        """Round an order to the instrument's steps and validate it locally"""
+        if not self.specs:
+            # Nothing loaded yet; let the exchange validate
+            return {
+                "success": True,
+                "qty": qty,
+                "stop_loss": stop_loss,
+                "take_profit": take_profit
+            }
+
+        spec = self.specs.get(symbol)
+        if spec is None:
+            return {"success": False, "error": f"Unknown symbol {symbol}"}
+
+        rounded_qty = _round_to_step(qty, spec.qty_step, ROUND_DOWN)
+        if rounded_qty <= 0 or rounded_qty < spec.min_qty:
+            return {
+                "success": False,
+                "error": f"Quantity {qty} below minimum {spec.min_qty} for {symbol}"
+            }
+        if spec.max_qty and rounded_qty > spec.max_qty:
+            return {
+                "success": False,
+                "error": f"Quantity {qty} above maximum {spec.max_qty} for {symbol}"
+            }
+        if price and spec.min_notional and rounded_qty * Decimal(str(price)) < spec.min_notional:
+            return {
+                "success": False,
+                "error": f"Order value below minimum {spec.min_notional} USDT for {symbol}"
+            }
+        if leverage and spec.max_leverage and not (spec.min_leverage <= leverage <= spec.max_leverage):
+            return {
+                "success": False,
+                "error": f"Leverage {leverage}x outside {spec.min_leverage}-{spec.max_leverage}x for {symbol}"
+            }
+
+        def round_price(value: Optional[float]) -> Optional[float]:
+            if not value:
+                return value
+            return float(_round_to_step(value, spec.tick_size, ROUND_HALF_UP))
+
+        return {
+            "success": True,
+            "qty": float(rounded_qty),
+            "stop_loss": round_price(stop_loss),
+            "take_profit": round_price(take_profit)
+        }
+
+instrument_cache = InstrumentCache(
+    config.INSTRUMENTS_CACHE_PATH,
+    config.INSTRUMENTS_REFRESH_INTERVAL
+)
@@ -0,0 +1,128 @@
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+from config import config
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import uuid
+
+# Follows a signal from the webhook request through the order queue,
+# the exchange order ID and the fill confirmation
+correlation_id: ContextVar[Optional[str]] = ContextVar("correlation_id", default=None)
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+def new_correlation_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(name)
+
+def parse_sample_rates(spec: str) -> Dict[int, float]:
+    """Parse "DEBUG=0.01,INFO=1" into {level: keep probability}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = item.partition("=")
+        rates[logging.getLevelName(name.strip().upper())] = float(rate)
+    return rates
+
+class ContextFilter(logging.Filter):
+    """Stamp the correlation ID and drop a share of low-level records.
+
+    Runs in the calling thread before the record is queued, so it sees
+    the caller's context. WARNING and above are never sampled.
+    """
+
+    def __init__(self, sample_rates: Dict[int, float]):
+        super().__init__()
+        self.sample_rates = sample_rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            rate = self.sample_rates.get(record.levelno, 1.0)
+            if rate < 1.0:
+                if random.random() >= rate:
+                    return False
+                record.sample_rate = rate
+        record.correlation_id = correlation_id.get()
+        return True
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queue records for the listener thread; drop them if it falls behind"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render message and traceback here, keep extras for the formatter
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and value is not None:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[NonBlockingQueueHandler] = None
+
+def dropped_records() -> int:
+    """Records discarded because the log queue was full"""
+    return _handler.dropped if _handler else 0
+
+def setup_logging():
+    """Route all logging through a background thread as JSON lines"""
+    global _listener, _handler
+    if _listener is not None:
+        return
+
+    log_queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+    _handler = NonBlockingQueueHandler(log_queue)
+    _handler.addFilter(ContextFilter(parse_sample_rates(config.LOG_SAMPLE_RATES)))
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter())
+
+    root = logging.getLogger()
+    root.handlers = [_handler]
+    root.setLevel(config.LOG_LEVEL)
+    # httpx logs every request at INFO, one line per exchange call
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    _listener = QueueListener(log_queue, output)
+    _listener.start()
+    atexit.register(stop_logging)
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
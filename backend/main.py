@@ -1,24 +1,50 @@
-from fastapi import FastAPI, HTTPException, Depends, Header, Request
+from fastapi import FastAPI, HTTPException, Depends, Header, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 import json
+import asyncio
+import time
 import uvicorn
 from fastapi import Query
 from datetime import datetime
-from auth import create_access_token, get_current_user, AUTH_USERNAME, AUTH_PASSWORD
+from auth import create_access_token, get_current_user, decode_username, AUTH_USERNAME, AUTH_PASSWORD
 from pydantic import BaseModel
-from database import init_db, get_db
+from database import init_db, get_db, async_session_maker
 from models import (
-    WebhookSignal, TradeResponse, SettingsUpdate, 
+    WebhookSignal, BatchWebhookSignal, TradeResponse, SettingsUpdate, 
     AccountStatus, Position, Trade, Settings
 )
 from bybit_client import bybit_client
 from webhook_handler import webhook_handler
+from group_commit import trade_writer
+from fill_tracker import fill_tracker
+from order_queue import order_queue
+from dedup import dedup_index
+from settings_store import settings_store
+from dashboard import dashboard_hub
+from position_book import position_book
+from private_stream import private_stream
+from ticker_stream import ticker_cache
+from instruments import instrument_cache
+from trade_queries import trade_history_query, encode_cursor
+from trade_export import stream_csv, stream_parquet
+from trade_reconciler import trade_reconciler
+from analytics import analytics
+from accounts import account_registry
+from signal_journal import signal_journal
+from risk_engine import risk_engine
+from cluster import cluster, file_lock
 from config import config
+from logger import setup_logging, get_logger, correlation_id, new_correlation_id, dropped_records
+import metrics
+
+setup_logging()
+logger = get_logger(__name__)
 
 app = FastAPI(title="Trading System API")
 from pydantic import BaseModel
@@ -33,8 +59,8 @@ class LoginRequest(BaseModel):
 
 # Add this class after your imports
 class ClosePositionRequest(BaseModel):
-    side: str
-    size: float
+    side: Optional[str] = None  # Defaults to the side in the position book
+    size: Optional[float] = None  # Defaults to the full position size
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -42,13 +68,62 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+@app.middleware("http")
+async def correlation_middleware(request: Request, call_next):
+    """Tag every log line of a request (and the work it queues) with one ID"""
+    request_id = request.headers.get("X-Request-ID") or new_correlation_id()
+    token = correlation_id.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        correlation_id.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+async def start_leader_services():
+    """Order execution, exchange streams and in-memory state; one worker only"""
+    # A promoted follower's snapshot dates from its own startup; the
+    # previous leader may have changed the row since
+    async with async_session_maker() as session:
+        settings = await session.get(Settings, 1)
+    if settings:
+        settings_store.load(settings)
+    await analytics.rebuild()
+    await bybit_client.seed_leverage_cache()
+    account_registry.load()
+    order_queue.start()
+    private_stream.start()
+    ticker_cache.start()
+    instrument_cache.start(bybit_client)
+    trade_reconciler.start()
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
-    await init_db()
-    print("Database initialized")
+    # Workers start together; keep them from racing to create the schema
+    with file_lock(f"{config.LEADER_LOCK_PATH}.init"):
+        await init_db()
+    logger.info("Database initialized")
+    await cluster.start(start_leader_services, dashboard_hub.relay)
+
+# Shutdown event
+@app.on_event("shutdown")
+async def shutdown_event():
+    await trade_reconciler.stop()
+    await instrument_cache.stop()
+    await ticker_cache.stop()
+    await private_stream.stop()
+    await dashboard_hub.stop()
+    await order_queue.stop()
+    await fill_tracker.stop()
+    await account_registry.close()
+    await bybit_client.close()
+    signal_journal.close()
+    # Hand over leadership only once queued orders have drained
+    await cluster.stop()
 
 # Root endpoint
 @app.get("/")
@@ -79,14 +154,12 @@ async def login_page():
 
 
 
-@app.get("/api/account/status", response_model=AccountStatus)
-async def get_account_status(current_user: str = Depends(get_current_user)):
-
-    """Check if Bybit account is connected and get balance"""
-    connection = bybit_client.check_connection()
+@cluster.operation("account_status")
+async def account_status():
+    connection = await bybit_client.check_connection()
     
     if connection["connected"]:
-        account_info = bybit_client.get_account_info()
+        account_info = await bybit_client.get_account_info()
         ##print(f"Account Status/Info: {account_info}")
         if account_info["success"]:
             return AccountStatus(
@@ -94,127 +167,206 @@ async def get_account_status(current_user: str = Depends(get_current_user)):
                 balance=account_info["balance"],
                 equity=account_info["equity"],
                 available_balance=account_info["available_balance"]
-            )
+            ).model_dump()
     
-    return AccountStatus(connected=False)
+    return AccountStatus(connected=False).model_dump()
 
-@app.get("/api/settings")
-async def get_settings(db: AsyncSession = Depends(get_db)):
-    """Get current trading settings"""
-    settings = await db.get(Settings, 1)
-    if settings:
-        return {
-            "auto_trading_enabled": settings.auto_trading_enabled,
-            "max_position_size": settings.max_position_size,
-            "risk_percentage": settings.risk_percentage
-        }
+@app.get("/api/account/status", response_model=AccountStatus)
+async def get_account_status(current_user: str = Depends(get_current_user)):
+
+    """Check if Bybit account is connected and get balance"""
+    return await cluster.run("account_status")
+
+@app.websocket("/ws/dashboard")
+async def dashboard_socket(websocket: WebSocket, token: Optional[str] = Query(None)):
+    """Live positions, balance and trade updates for the dashboard"""
+    if not decode_username(token):
+        await websocket.close(code=1008)
+        return
+    
+    await dashboard_hub.connect(websocket)
+    try:
+        # Clients only listen; reading detects the disconnect
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        dashboard_hub.disconnect(websocket)
+
+@cluster.operation("get_settings")
+async def read_settings():
+    if settings_store.loaded:
+        return settings_store.as_dict()
     return {"error": "Settings not found"}
 
-@app.put("/api/settings")
-async def update_settings(
-    settings_update: SettingsUpdate,
-    db: AsyncSession = Depends(get_db)
-):
-    """Update trading settings"""
-    settings = await db.get(Settings, 1)
+@cluster.operation("update_settings")
+async def write_settings(changes: dict):
+    async with async_session_maker() as db:
+        settings = await settings_store.update(db, SettingsUpdate(**changes))
     if not settings:
         return {"error": "Settings not found"}
     
-    if settings_update.auto_trading_enabled is not None:
-        settings.auto_trading_enabled = settings_update.auto_trading_enabled
-    if settings_update.max_position_size is not None:
-        settings.max_position_size = settings_update.max_position_size
-    if settings_update.risk_percentage is not None:
-        settings.risk_percentage = settings_update.risk_percentage
-    
-    await db.commit()
-    await db.refresh(settings)
-    
-    return {
-        "success": True,
-        "auto_trading_enabled": settings.auto_trading_enabled,
-        "max_position_size": settings.max_position_size,
-        "risk_percentage": settings.risk_percentage
-    }
+    return {"success": True, **settings}
+
+@app.get("/api/settings")
+async def get_settings():
+    """Get current trading settings"""
+    return await cluster.run("get_settings")
+
+@app.put("/api/settings")
+async def update_settings(settings_update: SettingsUpdate):
+    """Update trading settings"""
+    return await cluster.run("update_settings", changes=settings_update.model_dump())
+
+@cluster.operation("positions")
+async def open_positions():
+    return await position_book.get_positions()
 
 @app.get("/api/positions", response_model=List[Position])
 async def get_open_positions():
-    """Get all open positions from Bybit"""
-    positions = bybit_client.get_positions()
+    """Get all open positions from the local position book"""
+    positions = await cluster.run("positions")
     return [Position(**pos) for pos in positions]
 
 @app.get("/api/trades", response_model=List[TradeResponse])
 async def get_trade_history(
-    limit: int = 50,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    symbol: Optional[str] = None,
+    status: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get historical trades from database"""
-    result = await db.execute(
-        select(Trade).order_by(desc(Trade.created_at)).limit(limit)
-    )
+    """Get historical trades, newest first.
+    
+    Pass the X-Next-Cursor response header back as ``cursor`` for the next
+    page; the header is absent on the last page.
+    """
+    try:
+        query = trade_history_query(symbol, status, start, end, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
+    # One extra row tells whether another page exists
+    result = await db.execute(query.limit(limit + 1))
     trades = result.scalars().all()
+    
+    if len(trades) > limit:
+        trades = trades[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(trades[-1])
 
     return trades
 
-@app.delete("/api/order/{order_id}")
-async def cancel_order(
-    order_id: str,
-    symbol: str,
-    db: AsyncSession = Depends(get_db)
+@app.get("/api/trades/export")
+async def export_trades(
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
+    symbol: Optional[str] = None,
+    status: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
 ):
-    """Cancel an open order"""
-    result = bybit_client.cancel_order(symbol, order_id)
+    """Stream the trade history (newest first) as CSV or Parquet"""
+    query = trade_history_query(symbol, status, start, end)
+    if format == "parquet":
+        body = stream_parquet(query, config.EXPORT_CHUNK_SIZE)
+        media_type = "application/vnd.apache.parquet"
+    else:
+        body = stream_csv(query, config.EXPORT_CHUNK_SIZE)
+        media_type = "text/csv"
+    
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="trades.{format}"'}
+    )
+
+@cluster.operation("cancel_order")
+async def cancel_open_order(order_id: str, symbol: str):
+    result = await bybit_client.cancel_order(symbol, order_id)
     
     if result["success"]:
         # Update trade status in database
-        stmt = select(Trade).where(Trade.trade_id == order_id)
-        result = await db.execute(stmt)
-        trade = result.scalar_one_or_none()
-        
-        if trade:
-            trade.status = "cancelled"
-            trade.reason = "Cancelled by user"
-            await db.commit()
+        async with async_session_maker() as db:
+            stmt = select(Trade).where(Trade.trade_id == order_id)
+            trade = (await db.execute(stmt)).scalar_one_or_none()
+            
+            if trade:
+                trade.status = "cancelled"
+                trade.reason = "Cancelled by user"
+                await db.commit()
     
     return result
 
-
+@app.delete("/api/order/{order_id}")
+async def cancel_order(order_id: str, symbol: str):
+    """Cancel an open order"""
+    return await cluster.run("cancel_order", order_id=order_id, symbol=symbol)
 
 @app.post("/api/positions/{symbol}/close")
 async def close_position(
     symbol: str,
-    request: ClosePositionRequest,  # Use Pydantic model for request body
-    db: AsyncSession = Depends(get_db)
+    request: ClosePositionRequest  # Use Pydantic model for request body
 ):
     """Close a position by placing an opposite order"""
+    return await cluster.run("close_position", symbol=symbol, side=request.side, size=request.size)
+
+@cluster.operation("close_position")
+async def close_open_position(symbol: str, side: Optional[str], size: Optional[float]):
+    position = position_book.get(symbol)
+    side = side or (position["side"] if position else None)
+    size = size or (position["size"] if position else None)
+    if not side or not size:
+        return {
+            "success": False,
+            "error": f"No open position for {symbol}"
+        }
+    # Never send more than is open, so a stale dashboard cannot flip the position
+    if position and size > position["size"]:
+        size = position["size"]
+    
+    prepared = instrument_cache.prepare_order(symbol, size)
+    if not prepared["success"]:
+        return {
+            "success": False,
+            "error": prepared["error"]
+        }
+    size = prepared["qty"]
+    
     # Determine opposite side
-    opposite_side = "sell" if request.side.lower() == "buy" else "buy"
+    opposite_side = "sell" if side.lower() == "buy" else "buy"
     
     # Place market order to close position
-    result = bybit_client.place_order(
+    result = await bybit_client.place_order(
         symbol=symbol,
         side=opposite_side,
-        qty=request.size
+        qty=size
     )
     
-    print("$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$4")
-
-    print(result)
-    print("$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$$")
     if result["success"]:
         # Record the closing trade
         trade = Trade(
             trade_id=result["order_id"],
             symbol=symbol,
             side=opposite_side.upper(),
-            quantity=request.size,
-            status="filled",
+            quantity=size,
+            status="pending",
             reason="Position closed by user",
             created_at=datetime.utcnow()
         )
-        db.add(trade)
-        await db.commit()
+        async with async_session_maker() as db:
+            db.add(trade)
+            await db.commit()
+        logger.info("Close order placed", extra={
+            "trade_id": trade.id,
+            "order_id": trade.trade_id,
+            "symbol": symbol,
+            "qty": size
+        })
+        fill_tracker.track(trade.id, trade.trade_id, symbol)
+        dashboard_hub.publish_trade(trade)
         
         return {
             "success": True,
@@ -222,46 +374,264 @@ async def close_position(
             "order_id": result["order_id"]
         }
     else:
+        logger.warning("Close order failed: %s", result.get("error"), extra={"symbol": symbol})
         return {
             "success": False,
             "error": result.get("error", "Failed to close position")
         }
 
+def duplicate_signal_response():
+    return {
+        "success": True,
+        "duplicate": True,
+        "message": "Duplicate signal ignored"
+    }
+
 @app.post("/api/webhook")
 async def receive_webhook(
     request: Request,
-    token: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db)
+    token: Optional[str] = Query(None)
 ):
-    print(f"Received webhook with token: {token}")
+    received_at = time.perf_counter()
     if token != config.WEBHOOK_SECRET:
+        logger.warning("Webhook rejected: invalid token")
         raise HTTPException(status_code=403, detail="Forbidden: Invalid token")
     """Receive and process TradingView webhook"""
     # Get raw body for signature verification
     body = await request.body()
     body_str = body.decode()
     
-    
-    # Parse webhook data
+    # Only the leader dedups and queues; a follower's clock means nothing there
+    if cluster.is_follower:
+        outcome = await cluster.call("webhook", body_str=body_str)
+    else:
+        outcome = await accept_webhook(body_str, received_at)
+    return JSONResponse(status_code=outcome["status_code"], content=outcome["content"])
+
+@cluster.operation("webhook")
+async def accept_webhook(body_str: str, received_at: Optional[float] = None):
+    """Validate, dedup, record and queue a signal; returns status code and body"""
+    if received_at is None:
+        received_at = time.perf_counter()
+    return await record_and_queue(body_str, received_at)
+
+async def record_and_queue(body_str: str, received_at: float):
+    # Parse webhook data; a "legs" list marks a batch signal
     try:
-        data = json.loads(body_str)
-        signal = WebhookSignal(**data)
+        with metrics.webhook_stage_seconds.time(stage="parse"):
+            data = json.loads(body_str)
+            if isinstance(data, dict) and "legs" in data:
+                signal = BatchWebhookSignal(**data)
+            else:
+                signal = WebhookSignal(**data)
     except Exception as e:
+        metrics.webhook_signals_total.inc(outcome="invalid")
         raise HTTPException(status_code=400, detail=f"Invalid webhook data: {str(e)}")
+    is_batch = isinstance(signal, BatchWebhookSignal)
+    logger.debug("Webhook received", extra={"payload": data})
+    if is_batch and not signal.legs:
+        raise HTTPException(status_code=400, detail="Invalid webhook data: empty batch")
     
-    # Get current settings
-    settings = await db.get(Settings, 1)
-    if not settings:
+    # Settings are served from memory, see settings_store
+    with metrics.webhook_stage_seconds.time(stage="settings"):
+        settings_loaded = settings_store.loaded
+        auto_trading_enabled = settings_store.auto_trading_enabled
+    if not settings_loaded:
         raise HTTPException(status_code=500, detail="Settings not found")
     
-    # Process the signal
-    result = await webhook_handler.process_signal(
-        signal, 
-        db, 
-        settings.auto_trading_enabled
-    )
+    # Drop redeliveries before touching the exchange or the database
+    with metrics.webhook_stage_seconds.time(stage="dedup"):
+        idempotency_key = dedup_index.key_for(signal)
+        claimed = dedup_index.claim(idempotency_key)
+    if not claimed:
+        metrics.webhook_signals_total.inc(outcome="duplicate")
+        return {"status_code": 200, "content": duplicate_signal_response()}
     
-    return result
+    # Record the signal and hand it to the order workers
+    try:
+        with metrics.webhook_stage_seconds.time(stage="record"):
+            if is_batch:
+                trades = await webhook_handler.record_batch(
+                    signal,
+                    auto_trading_enabled,
+                    idempotency_key
+                )
+            else:
+                trades = [await webhook_handler.record_signal(
+                    signal,
+                    auto_trading_enabled,
+                    idempotency_key
+                )]
+    except IntegrityError:
+        # Already recorded before a restart or LRU eviction
+        dedup_index.suppressed += 1
+        metrics.webhook_signals_total.inc(outcome="duplicate")
+        return {"status_code": 200, "content": duplicate_signal_response()}
+    except Exception:
+        dedup_index.release(idempotency_key)
+        raise
+    
+    # Every recorded signal is journaled for offline replay (see replay.py)
+    signal_journal.append(data)
+    
+    trade_ids = [trade.id for trade in trades]
+    ids = {"trade_ids": trade_ids} if is_batch else {"trade_id": trade_ids[0]}
+    if trades[0].status == "rejected":
+        metrics.webhook_signals_total.inc(outcome="disabled")
+        return {"status_code": 200, "content": {
+            "success": False,
+            "message": "Trade recorded but not executed - auto trading disabled",
+            **ids
+        }}
+    
+    for trade in trades:
+        dashboard_hub.publish_trade(trade)
+    
+    try:
+        if is_batch:
+            order_queue.submit_batch(trade_ids, signal, received_at)
+        else:
+            order_queue.submit(trade_ids[0], signal, received_at)
+    except asyncio.QueueFull:
+        # Free the key so the client's retry of this 503 is executed
+        # rather than ignored as a duplicate
+        for trade in trades:
+            trade.status = "rejected"
+            trade.reason = "Order queue full"
+            trade.idempotency_key = None
+        await trade_writer.write(trades)
+        dedup_index.release(idempotency_key)
+        metrics.webhook_signals_total.inc(outcome="queue_full")
+        raise HTTPException(status_code=503, detail="Order queue full")
+    
+    metrics.webhook_signals_total.inc(outcome="accepted")
+    logger.info("Signal accepted", extra={"trade_ids": trade_ids})
+    return {"status_code": 202, "content": {
+        "success": True,
+        "message": "Signal accepted",
+        **ids
+    }}
+
+@cluster.operation("analytics")
+async def analytics_snapshot():
+    return analytics.snapshot()
+
+@cluster.operation("analytics_rebuild")
+async def analytics_rebuild():
+    await analytics.rebuild()
+    return analytics.snapshot()
+
+@app.get("/api/analytics")
+async def get_analytics():
+    """Get win rate, realised PnL and drawdown per symbol, day and strategy, plus exposure"""
+    return await cluster.run("analytics")
+
+@app.post("/api/analytics/rebuild")
+async def rebuild_analytics(current_user: str = Depends(get_current_user)):
+    """Recompute the analytics aggregates from the full trade history"""
+    return await cluster.run("analytics_rebuild")
+
+@cluster.operation("webhook_stats")
+async def webhook_stats():
+    return {**dedup_index.stats(), "record_commits": trade_writer.stats()}
+
+@cluster.operation("accounts")
+async def account_stats():
+    return account_registry.stats()
+
+@cluster.operation("risk")
+async def risk_stats():
+    return {
+        **risk_engine.stats(),
+        "accounts": {account.name: account.risk.stats() for account in account_registry.targets()}
+    }
+
+@cluster.operation("rate_limits")
+async def rate_limit_stats():
+    return bybit_client.rate_limiter.stats()
+
+@app.get("/api/webhook/stats")
+async def get_webhook_stats():
+    """Get webhook deduplication and group commit counters"""
+    return await cluster.run("webhook_stats")
+
+@app.get("/api/accounts")
+async def get_accounts():
+    """Get order count, failures and average order latency per trading account"""
+    return await cluster.run("accounts")
+
+@app.get("/api/risk")
+async def get_risk():
+    """Get open positions, gross exposure and reserved orders against the pre-trade limits.
+
+    Fan-out accounts are reported under "accounts".
+    """
+    return await cluster.run("risk")
+
+@app.get("/api/rate-limits")
+async def get_rate_limits():
+    """Get Bybit request scheduler queue depth and wait times per endpoint group"""
+    return await cluster.run("rate_limits")
+
+# Queue depths are read when /metrics is scraped
+metrics.gauge(
+    "order_queue_depth",
+    "Signals waiting for an order worker, per shard",
+    lambda: {(("shard", str(i)),): depth for i, depth in enumerate(order_queue.shard_depths())}
+)
+metrics.gauge(
+    "bybit_rate_limit_queue_depth",
+    "Requests waiting for a rate-limit token, per endpoint group",
+    lambda: {
+        (("group", group),): stats["queue_depth"]
+        for group, stats in bybit_client.rate_limiter.stats().items()
+    }
+)
+metrics.gauge(
+    "fill_tracker_pending",
+    "Placed orders still awaiting fill confirmation",
+    lambda: {(): fill_tracker.pending()}
+)
+metrics.gauge(
+    "dedup_tracked_keys",
+    "Idempotency keys held by the webhook dedup index",
+    lambda: {(): dedup_index.stats()["tracked_keys"]}
+)
+metrics.gauge(
+    "dashboard_clients",
+    "Open dashboard WebSocket connections",
+    lambda: {(): len(dashboard_hub.clients)}
+)
+metrics.gauge(
+    "log_records_dropped",
+    "Log records discarded because the log queue was full",
+    lambda: {(): dropped_records()}
+)
+
+metrics.gauge(
+    "leader",
+    "1 in the worker that executes orders",
+    lambda: {(("role", cluster.role),): int(not cluster.is_follower)}
+)
+
+@cluster.operation("metrics")
+async def render_metrics():
+    return metrics.registry.render()
+
+@cluster.operation("dashboard_state")
+async def dashboard_state():
+    return await dashboard_hub.current_state()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text exposition of latency histograms, counters and queue depths.
+
+    Served from the leader, where orders are executed and measured.
+    """
+    return PlainTextResponse(
+        await cluster.run("metrics"),
+        media_type="text/plain; version=0.0.4"
+    )
 
 @app.get("/api/trades/{trade_id}")
 async def get_trade_details(
@@ -276,9 +646,18 @@ async def get_trade_details(
     return TradeResponse.from_orm(trade)
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host=config.HOST,
-        port=config.PORT,
-        reload=True
-    )
\ No newline at end of file
+    if config.WORKERS > 1:
+        # Reload cannot supervise several workers
+        uvicorn.run(
+            "main:app",
+            host=config.HOST,
+            port=config.PORT,
+            workers=config.WORKERS
+        )
+    else:
+        uvicorn.run(
+            "main:app",
+            host=config.HOST,
+            port=config.PORT,
+            reload=True
+        )
\ No newline at end of file
@@ -0,0 +1,150 @@
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import bisect
+import time
+
+# Seconds; covers in-process stages (sub-ms) up to slow exchange calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = _label_key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in self.values.items():
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+class Gauge:
+    """A gauge read from a callback at scrape time"""
+
+    def __init__(self, name: str, help: str,
+                 collect: Callable[[], Dict[LabelKey, float]]):
+        self.name = name
+        self.help = help
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for key, value in self.collect().items():
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        # label key -> [per-bucket counts (+Inf last), sum, count]
+        self.values: Dict[LabelKey, list] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = _label_key(labels)
+        series = self.values.get(key)
+        if series is None:
+            series = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', repr(bound)))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, Any] = {}
+
+    def register(self, metric):
+        """Add a metric; one registered again under its name replaces the first.
+
+        Running main.py imports it twice (as __main__ and as main), so its
+        gauges are registered twice with the same names.
+        """
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+webhook_stage_seconds = registry.register(Histogram(
+    "webhook_stage_seconds",
+    "Time spent in each stage of webhook processing"
+))
+webhook_latency_seconds = registry.register(Histogram(
+    "webhook_latency_seconds",
+    "Webhook receipt to order accepted (or rejected) by the exchange"
+))
+webhook_signals_total = registry.register(Counter(
+    "webhook_signals_total",
+    "Webhook signals by outcome"
+))
+bybit_request_seconds = registry.register(Histogram(
+    "bybit_request_seconds",
+    "Bybit REST request latency by endpoint"
+))
+bybit_request_errors_total = registry.register(Counter(
+    "bybit_request_errors_total",
+    "Bybit REST errors by endpoint and retCode (or exception type)"
+))
+account_order_seconds = registry.register(Histogram(
+    "account_order_seconds",
+    "Order placement latency per trading account"
+))
+account_fills_total = registry.register(Counter(
+    "account_fills_total",
+    "Confirmed order outcomes per trading account"
+))
+db_commit_seconds = registry.register(Histogram(
+    "db_commit_seconds",
+    "Database commit latency by call site"
+))
+risk_rejections_total = registry.register(Counter(
+    "risk_rejections_total",
+    "Signals rejected by the pre-trade risk engine, by limit"
+))
+
+def gauge(name: str, help: str, collect: Callable[[], Dict[LabelKey, float]]) -> Gauge:
+    """Register a gauge evaluated at scrape time"""
+    return registry.register(Gauge(name, help, collect))
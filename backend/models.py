@@ -1,8 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 Base = declarative_base()
 
@@ -25,6 +25,15 @@ class Trade(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     webhook_data = Column(Text, nullable=True)  # Store original webhook JSON
+    idempotency_key = Column(String, unique=True, index=True, nullable=True)  # Webhook dedup key
+    account = Column(String, nullable=True, index=True)  # Fan-out account; NULL for the primary
+    
+    # Trade history pages newest-first on (created_at, id), optionally per symbol or status
+    __table_args__ = (
+        Index("ix_trades_created_at_id", "created_at", "id"),
+        Index("ix_trades_symbol_created_at_id", "symbol", "created_at", "id"),
+        Index("ix_trades_status_created_at_id", "status", "created_at", "id"),
+    )
 
 class Settings(Base):
     __tablename__ = "settings"
@@ -35,6 +44,13 @@ class Settings(Base):
     risk_percentage = Column(Float, default=1.0)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+class SyncState(Base):
+    __tablename__ = "sync_state"
+    
+    name = Column(String, primary_key=True)  # e.g. "order_history"
+    value = Column(String, nullable=True)  # High-water mark, e.g. updatedTime in ms
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 # Pydantic Models (API Request/Response)
 class WebhookSignal(BaseModel):
     action: str  # "buy" or "sell"
@@ -45,6 +61,12 @@ class WebhookSignal(BaseModel):
     quantity: Optional[float] = None
     leverage: Optional[int] = 1  # Add leverage with default value
     alert_message: Optional[str] = None
+    idempotency_key: Optional[str] = None  # Optional client-supplied dedup key
+    
+class BatchWebhookSignal(BaseModel):
+    legs: List[WebhookSignal]  # One market order per leg
+    alert_message: Optional[str] = None
+    idempotency_key: Optional[str] = None
     
 class TradeResponse(BaseModel):
     id: int
@@ -59,6 +81,7 @@ class TradeResponse(BaseModel):
     status: str
     reason: Optional[str] = None
     pnl: Optional[float] = None
+    account: Optional[str] = None
     created_at: datetime
     
     class Config:
@@ -0,0 +1,145 @@
+from models import WebhookSignal, BatchWebhookSignal
+from webhook_handler import webhook_handler
+from typing import List, Optional
+from config import config
+from logger import get_logger, correlation_id
+import asyncio
+import time
+import zlib
+import metrics
+
+logger = get_logger(__name__)
+
+class BatchJob:
+    """A batch signal queued on every shard that owns one of its symbols.
+
+    Each shard worker that reaches the job checks in; the last one to
+    arrive executes it while the others wait, so the batch keeps its
+    place in the per-symbol order of every symbol it touches.
+    """
+
+    def __init__(self, trade_ids: List[int], batch: BatchWebhookSignal, shards: int,
+                 received_at: Optional[float] = None):
+        self.trade_ids = trade_ids
+        self.batch = batch
+        self.shards = shards
+        self.received_at = received_at
+        self.queued_at = time.perf_counter()
+        self.correlation_id = correlation_id.get()
+        self.arrived = 0
+        self.done = asyncio.Event()
+
+class OrderQueue:
+    """Executes accepted webhook signals on a pool of workers.
+
+    Every worker owns its own queue and a symbol always hashes to the same
+    worker, so signals for one symbol execute strictly in arrival order
+    while different symbols execute concurrently.
+    """
+
+    def __init__(self, workers: int, maxsize: int):
+        self.workers = max(1, workers)
+        self.maxsize = maxsize
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """Start the worker pool (must be called from the running loop)"""
+        if self._tasks:
+            return
+        # Each shard gets an equal share of the total capacity
+        shard_size = max(1, self.maxsize // self.workers) if self.maxsize > 0 else 0
+        self._queues = [asyncio.Queue(maxsize=shard_size) for _ in range(self.workers)]
+        self._tasks = [
+            asyncio.create_task(self._worker(queue)) for queue in self._queues
+        ]
+
+    async def stop(self, timeout: float = 10.0):
+        """Let workers drain their queues, then stop them"""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues)),
+                timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Order queue stopped with %d signals still queued", self.depth())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, trade_id: int, signal: WebhookSignal,
+               received_at: Optional[float] = None):
+        """Queue a recorded trade for execution; raises asyncio.QueueFull"""
+        self._queue_for(signal.symbol).put_nowait(
+            (trade_id, signal, received_at, time.perf_counter(), correlation_id.get())
+        )
+
+    def submit_batch(self, trade_ids: List[int], batch: BatchWebhookSignal,
+                     received_at: Optional[float] = None):
+        """Queue a recorded batch for execution; raises asyncio.QueueFull"""
+        queues = []
+        for leg in batch.legs:
+            queue = self._queue_for(leg.symbol)
+            if queue not in queues:
+                queues.append(queue)
+
+        # Check every shard first: a partially queued batch would never run.
+        # Enqueueing without awaiting keeps batch order identical across
+        # shards, so two batches can never wait on each other.
+        if any(queue.full() for queue in queues):
+            raise asyncio.QueueFull()
+        job = BatchJob(trade_ids, batch, len(queues), received_at)
+        for queue in queues:
+            queue.put_nowait(job)
+
+    def depth(self) -> int:
+        """Number of signals waiting for a worker"""
+        return sum(queue.qsize() for queue in self._queues)
+
+    def shard_depths(self) -> List[int]:
+        return [queue.qsize() for queue in self._queues]
+
+    def _queue_for(self, symbol: str) -> asyncio.Queue:
+        if not self._queues:
+            raise RuntimeError("Order queue is not running")
+        return self._queues[zlib.crc32(symbol.upper().encode()) % len(self._queues)]
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            item = await queue.get()
+            # Log lines (and fill tracking started from here) keep the request's ID
+            token = correlation_id.set(
+                item.correlation_id if isinstance(item, BatchJob) else item[4]
+            )
+            try:
+                if isinstance(item, BatchJob):
+                    await self._run_batch(item)
+                else:
+                    trade_id, signal, received_at, queued_at, _ = item
+                    metrics.webhook_stage_seconds.observe(
+                        time.perf_counter() - queued_at, stage="queue_wait"
+                    )
+                    await webhook_handler.execute_queued(trade_id, signal, received_at)
+            except Exception:
+                logger.exception("Error executing queued signal")
+            finally:
+                correlation_id.reset(token)
+                queue.task_done()
+
+    async def _run_batch(self, job: BatchJob):
+        job.arrived += 1
+        if job.arrived < job.shards:
+            await job.done.wait()
+            return
+        metrics.webhook_stage_seconds.observe(
+            time.perf_counter() - job.queued_at, stage="queue_wait"
+        )
+        try:
+            await webhook_handler.execute_batch_queued(job.trade_ids, job.batch, job.received_at)
+        finally:
+            job.done.set()
+
+order_queue = OrderQueue(config.ORDER_WORKERS, config.ORDER_QUEUE_SIZE)
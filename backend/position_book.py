@@ -0,0 +1,137 @@
+from bybit_client import bybit_client, parse_position
+from typing import Dict, Any, List, Optional
+from config import config
+import asyncio
+import time
+
+class PositionBook:
+    """Open positions keyed by symbol, kept current by the private stream.
+
+    Stream updates are applied as they arrive and the whole book is
+    periodically replaced from REST to repair any missed messages. Without
+    the stream, own fills are applied locally and confirmed by at most one
+    REST reload per ``reconcile_debounce`` seconds.
+    """
+
+    def __init__(self, reconcile_debounce: float = 2.0, client=None):
+        self.client = client or bybit_client
+        self.reconcile_debounce = reconcile_debounce
+        self.positions: Dict[str, Dict[str, Any]] = {}
+        self.ready = False
+        # True while the private stream is delivering updates
+        self.live = False
+        self.updated_at: Optional[float] = None
+        self._last_reconcile = 0.0
+        self._pending_reconcile: Optional[asyncio.Task] = None
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self.positions.get(symbol)
+
+    def all(self) -> List[Dict[str, Any]]:
+        return list(self.positions.values())
+
+    def apply(self, raw: Dict[str, Any]):
+        """Apply one raw position entry from the stream"""
+        symbol = raw.get("symbol")
+        if not symbol:
+            return
+        if raw.get("leverage"):
+            self.client.leverage_cache[symbol] = float(raw["leverage"])
+
+        position = parse_position(raw)
+        if position:
+            self.positions[symbol] = position
+        else:
+            self.positions.pop(symbol, None)
+        self.updated_at = time.time()
+
+    def mark(self, symbol: str, mark_price: float):
+        """Recompute a held position's PnL locally from a new mark price"""
+        position = self.positions.get(symbol)
+        if position is None or position["current_price"] == mark_price:
+            return
+
+        direction = 1 if position["side"].lower() == "buy" else -1
+        pnl = (mark_price - position["entry_price"]) * position["size"] * direction
+        leverage = position["leverage"]
+        position_value = position["entry_price"] * position["size"]
+        margin_used = position_value / leverage if leverage > 0 else position_value
+
+        # Replace rather than mutate, so holders of the old row can diff it
+        self.positions[symbol] = {
+            **position,
+            "current_price": mark_price,
+            "pnl": pnl,
+            "pnl_percentage": (pnl / margin_used) * 100 if margin_used > 0 else 0
+        }
+
+    def apply_fill(self, symbol: str, side: str, qty: float, price: float):
+        """Apply one of our own fills until a reconcile confirms the book"""
+        position = self.positions.get(symbol)
+        order_qty = qty if side.lower() == "buy" else -qty
+        current_qty = 0.0
+        entry_price = price
+        if position:
+            current_qty = position["size"] if position["side"].lower() == "buy" else -position["size"]
+            entry_price = position["entry_price"]
+        new_qty = current_qty + order_qty
+
+        if abs(new_qty) < 1e-12:
+            self.positions.pop(symbol, None)
+            self.updated_at = time.time()
+            return
+        if current_qty == 0 or current_qty * new_qty < 0:
+            # Opened, or flipped through zero: a fresh position at this price
+            entry_price = price
+        elif abs(new_qty) > abs(current_qty):
+            entry_price = (entry_price * abs(current_qty) + price * qty) / abs(new_qty)
+
+        mark_price = position["current_price"] if position else price
+        leverage = position["leverage"] if position else self.client.leverage_cache.get(symbol, 1.0)
+        size = abs(new_qty)
+        pnl = (mark_price - entry_price) * new_qty
+        margin_used = entry_price * size / leverage if leverage > 0 else entry_price * size
+        self.positions[symbol] = {
+            "symbol": symbol,
+            "side": "Buy" if new_qty > 0 else "Sell",
+            "size": size,
+            "leverage": leverage,
+            "entry_price": entry_price,
+            "current_price": mark_price,
+            "pnl": pnl,
+            "pnl_percentage": (pnl / margin_used) * 100 if margin_used > 0 else 0
+        }
+        self.updated_at = time.time()
+
+    def request_reconcile(self):
+        """Reload from REST soon, at most once per reconcile_debounce seconds"""
+        if self._pending_reconcile is not None and not self._pending_reconcile.done():
+            return
+        self._pending_reconcile = asyncio.create_task(self._debounced_reconcile())
+
+    async def _debounced_reconcile(self):
+        await asyncio.sleep(max(0.0, self._last_reconcile + self.reconcile_debounce - time.time()))
+        await self.reconcile()
+
+    def replace(self, positions: List[Dict[str, Any]]):
+        """Replace the book with a full list of parsed positions"""
+        self.positions = {pos["symbol"]: pos for pos in positions}
+        self.ready = True
+        self.updated_at = time.time()
+
+    async def reconcile(self) -> bool:
+        """Reload the book from REST; keeps the current book on failure"""
+        self._last_reconcile = time.time()
+        positions = await self.client.fetch_positions()
+        if positions is None:
+            return False
+        self.replace(positions)
+        return True
+
+    async def get_positions(self) -> List[Dict[str, Any]]:
+        """Positions from memory, loading them once if the book is empty"""
+        if not self.ready:
+            await self.reconcile()
+        return self.all()
+
+position_book = PositionBook(config.POSITION_RECONCILE_DEBOUNCE)
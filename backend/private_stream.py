@@ -0,0 +1,125 @@
+from bybit_client import bybit_client
+from position_book import position_book
+from fill_tracker import fill_tracker
+from typing import Dict, Any, List, Optional
+from config import config
+from logger import get_logger
+import websockets
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+
+logger = get_logger(__name__)
+
+BYBIT_WS_PRIVATE_MAINNET = "wss://stream.bybit.com/v5/private"
+BYBIT_WS_PRIVATE_TESTNET = "wss://stream-testnet.bybit.com/v5/private"
+
+class PrivateStream:
+    """Bybit private WebSocket feed for positions, orders and executions.
+
+    Position updates go to the position book, final order states to the
+    fill tracker. The book is also reconciled over REST on every
+    (re)connect and every ``reconcile_interval`` seconds.
+    """
+
+    def __init__(self, url: Optional[str] = None, reconcile_interval: float = 60.0):
+        self.client = bybit_client
+        self.url = url or (
+            BYBIT_WS_PRIVATE_TESTNET if self.client.testnet else BYBIT_WS_PRIVATE_MAINNET
+        )
+        self.reconcile_interval = reconcile_interval
+        self.topics = ["position", "order", "execution"]
+        self.connected = False
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """Start the stream and the reconciliation loop"""
+        if self._tasks:
+            return
+        self._tasks.append(asyncio.create_task(self._reconcile_loop()))
+        if self.client.api_key and self.client.api_secret:
+            self._tasks.append(asyncio.create_task(self._run()))
+        else:
+            logger.warning("Private stream disabled: no API credentials")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _auth_message(self) -> Dict[str, Any]:
+        expires = int((time.time() + 10) * 1000)
+        signature = hmac.new(
+            self.client.api_secret.encode(),
+            f"GET/realtime{expires}".encode(),
+            hashlib.sha256
+        ).hexdigest()
+        return {"op": "auth", "args": [self.client.api_key, expires, signature]}
+
+    async def _run(self):
+        delay = 1
+        while True:
+            try:
+                async with websockets.connect(self.url, ping_interval=None, close_timeout=5) as ws:
+                    await ws.send(json.dumps(self._auth_message()))
+                    response = json.loads(await asyncio.wait_for(ws.recv(), 10))
+                    if not response.get("success"):
+                        raise ConnectionError(f"Private stream auth failed: {response.get('ret_msg')}")
+
+                    await ws.send(json.dumps({"op": "subscribe", "args": self.topics}))
+                    self.connected = True
+                    position_book.live = True
+                    delay = 1
+
+                    # Catch up on anything missed while disconnected
+                    await position_book.reconcile()
+
+                    pinger = asyncio.create_task(self._ping(ws))
+                    try:
+                        async for raw in ws:
+                            self._dispatch(json.loads(raw))
+                    finally:
+                        pinger.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Private stream error: %s", e)
+            finally:
+                self.connected = False
+                position_book.live = False
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60)
+
+    async def _ping(self, ws):
+        # Bybit drops connections without an application-level ping
+        while True:
+            await asyncio.sleep(20)
+            await ws.send(json.dumps({"op": "ping"}))
+
+    def _dispatch(self, message: Dict[str, Any]):
+        topic = message.get("topic")
+        if topic == "position":
+            for raw in message.get("data", []):
+                position_book.apply(raw)
+        elif topic == "order":
+            for order in message.get("data", []):
+                fill_tracker.notify(order)
+        elif topic == "execution":
+            self.client.invalidate_account_state()
+
+    async def _reconcile_loop(self):
+        while True:
+            try:
+                await position_book.reconcile()
+            except Exception as e:
+                logger.error("Position reconciliation failed: %s", e)
+            await asyncio.sleep(self.reconcile_interval)
+
+private_stream = PrivateStream(
+    url=config.BYBIT_WS_PRIVATE_URL,
+    reconcile_interval=config.POSITION_RECONCILE_INTERVAL
+)
@@ -0,0 +1,200 @@
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import heapq
+import itertools
+import time
+
+# Requests that change orders go first; reads fill the remaining budget
+PRIORITY_TRADE = 0
+PRIORITY_READ = 1
+
+# group: (requests per second, priority, path prefixes)
+ENDPOINT_GROUPS: Dict[str, Tuple[float, int, Tuple[str, ...]]] = {
+    "order": (10, PRIORITY_TRADE, ("/v5/order/create", "/v5/order/cancel")),
+    "leverage": (10, PRIORITY_TRADE, ("/v5/position/set-leverage",)),
+    "order_query": (50, PRIORITY_READ, ("/v5/order/realtime", "/v5/order/history")),
+    "position": (50, PRIORITY_READ, ("/v5/position/",)),
+    "account": (50, PRIORITY_READ, ("/v5/account/",)),
+    "market": (50, PRIORITY_READ, ("/v5/market/",)),
+}
+
+# Bybit allows 600 requests per 5 seconds per IP across all endpoints
+GLOBAL_RATE = 120
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        # Set from rate-limit headers when the exchange says we are out
+        self.blocked_until = 0.0
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token is available"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class EndpointGroup:
+    def __init__(self, name: str, rate: float, priority: int):
+        self.name = name
+        self.priority = priority
+        self.bucket = TokenBucket(rate)
+        self.waiting = 0
+        self.requests = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+class RateLimiter:
+    """Token-bucket request scheduler for Bybit endpoint groups.
+
+    Every request takes a token from its group's bucket and from a global
+    per-IP bucket. Waiting requests are granted in priority order, so
+    order placement and cancellation are never stuck behind reads.
+    Buckets are corrected from the X-Bapi-Limit-* response headers.
+    """
+
+    def __init__(self, groups: Dict[str, Tuple[float, int, Tuple[str, ...]]] = ENDPOINT_GROUPS,
+                 global_rate: float = GLOBAL_RATE,
+                 global_bucket: Optional[TokenBucket] = None):
+        self.groups = {
+            name: EndpointGroup(name, rate, priority)
+            for name, (rate, priority, _) in groups.items()
+        }
+        self.default_group = EndpointGroup("other", 10, PRIORITY_READ)
+        self._prefixes: List[Tuple[str, EndpointGroup]] = [
+            (prefix, self.groups[name])
+            for name, (_, _, prefixes) in groups.items()
+            for prefix in prefixes
+        ]
+        # Group limits are per account; pass one bucket to every account's
+        # limiter to share the per-IP limit
+        self.global_bucket = global_bucket or TokenBucket(global_rate)
+        self._waiters: list = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def group_for(self, path: str) -> EndpointGroup:
+        for prefix, group in self._prefixes:
+            if path.startswith(prefix):
+                return group
+        return self.default_group
+
+    async def acquire(self, path: str) -> float:
+        """Wait for permission to send a request; returns the time waited"""
+        group = self.group_for(path)
+        group.requests += 1
+        start = time.monotonic()
+
+        if not self._waiters and self._try_take(group, start):
+            return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (group.priority, next(self._sequence), group, future))
+        group.waiting += 1
+        self._ensure_dispatcher()
+        self._wakeup.set()
+        try:
+            await future
+        finally:
+            group.waiting -= 1
+
+        waited = time.monotonic() - start
+        group.throttled += 1
+        group.total_wait += waited
+        group.max_wait = max(group.max_wait, waited)
+        return waited
+
+    def update_from_headers(self, path: str, headers) -> None:
+        """Adjust a group's bucket from Bybit's rate-limit response headers"""
+        remaining = headers.get("X-Bapi-Limit-Status")
+        if remaining is None:
+            return
+        group = self.group_for(path)
+        bucket = group.bucket
+        now = time.monotonic()
+        bucket.refill(now)
+
+        limit = headers.get("X-Bapi-Limit")
+        if limit and float(limit) > 0:
+            bucket.rate = bucket.capacity = float(limit)
+        bucket.tokens = min(bucket.tokens, float(remaining))
+
+        if float(remaining) <= 0:
+            self.block(path, headers.get("X-Bapi-Limit-Reset-Timestamp"))
+
+    def block(self, path: str, reset_timestamp_ms: Optional[str] = None) -> float:
+        """Stop a group until the reset time (or one second); returns the delay"""
+        delay = 1.0
+        if reset_timestamp_ms:
+            delay = max(0.0, float(reset_timestamp_ms) / 1000 - time.time())
+        bucket = self.group_for(path).bucket
+        bucket.tokens = 0
+        bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + delay)
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        groups = list(self.groups.values()) + [self.default_group]
+        return {
+            group.name: {
+                "queue_depth": group.waiting,
+                "requests": group.requests,
+                "throttled": group.throttled,
+                "avg_wait_ms": (group.total_wait / group.throttled * 1000) if group.throttled else 0.0,
+                "max_wait_ms": group.max_wait * 1000
+            }
+            for group in groups
+        }
+
+    def _try_take(self, group: EndpointGroup, now: float) -> bool:
+        group.bucket.refill(now)
+        self.global_bucket.refill(now)
+        if group.bucket.wait_time(now) > 0 or self.global_bucket.wait_time(now) > 0:
+            return False
+        group.bucket.tokens -= 1
+        self.global_bucket.tokens -= 1
+        return True
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def _dispatch(self):
+        """Grant waiting requests in priority order as tokens refill"""
+        while self._waiters:
+            self._wakeup.clear()
+            now = time.monotonic()
+            next_wait = None
+
+            for entry in sorted(self._waiters):
+                _, _, group, future = entry
+                if future.done():
+                    continue
+                if self._try_take(group, now):
+                    future.set_result(None)
+                    continue
+                wait = max(group.bucket.wait_time(now), self.global_bucket.wait_time(now))
+                next_wait = wait if next_wait is None else min(next_wait, wait)
+                if self.global_bucket.wait_time(now) > 0:
+                    # Global budget is gone; lower priorities must not skip ahead
+                    break
+
+            self._waiters = [entry for entry in self._waiters if not entry[3].done()]
+            heapq.heapify(self._waiters)
+            if not self._waiters:
+                break
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), max(next_wait or 0.001, 0.001))
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,170 @@
+from models import WebhookSignal, Trade
+from webhook_handler import WebhookHandler
+from fill_tracker import fill_tracker
+from position_book import position_book
+from instruments import instrument_cache
+from settings_store import settings_store
+from database import init_db, async_session_maker
+from simulated_exchange import SimulatedExchange
+from sqlalchemy import select, func
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from bisect import bisect_right
+from datetime import timezone
+import csv
+import json
+import re
+import time
+
+def _to_seconds(value: str) -> float:
+    """Kline start time as epoch seconds; Bybit gives milliseconds"""
+    number = float(value)
+    return number / 1000 if number > 1e11 else number
+
+def load_klines(path: str) -> Dict[str, Tuple[List[float], List[float]]]:
+    """Close prices per symbol from a CSV with symbol, timestamp and close columns"""
+    rows: Dict[str, List[Tuple[float, float]]] = {}
+    with open(path, newline="") as file:
+        for row in csv.DictReader(file):
+            rows.setdefault(row["symbol"], []).append((_to_seconds(row["timestamp"]), float(row["close"])))
+    klines = {}
+    for symbol, points in rows.items():
+        points.sort()
+        klines[symbol] = ([ts for ts, _ in points], [price for _, price in points])
+    return klines
+
+class ReplayEngine:
+    """Pushes journaled signals through WebhookHandler.process_signal.
+
+    Orders go to a SimulatedExchange instead of Bybit and trades are written
+    to whatever database DATABASE_URL points at, so run it against a
+    scratch database. Signals are processed back to back, as fast as the
+    handler allows. Prices come from klines where given (the last close at
+    or before the signal) and from the signal's own price otherwise.
+    """
+
+    def __init__(self, exchange: SimulatedExchange,
+                 klines: Optional[Dict[str, Tuple[List[float], List[float]]]] = None,
+                 settings: Optional[Dict[str, Any]] = None):
+        self.exchange = exchange
+        self.klines = klines or {}
+        # Trading settings to test, in place of the database's
+        self.settings = settings or {}
+        # Next kline index to apply, per symbol
+        self._cursor = {symbol: 0 for symbol in self.klines}
+        self.handler = WebhookHandler()
+        self.handler.client = exchange
+        # Confirm fills through the fill tracker as the private stream would
+        exchange.on_fill = fill_tracker.notify
+        self.latencies: List[float] = []
+
+    async def run(self, signals: Iterable[Tuple[float, Dict[str, Any]]]) -> Dict[str, Any]:
+        await init_db()
+        for name, value in self.settings.items():
+            setattr(settings_store, name, value)
+        instrument_cache.load_from_disk()
+        # The exchange's fills reach the trade rows and the position book
+        # (and so the risk engine) through the live code paths
+        fill_tracker.client = self.exchange
+        position_book.client = self.exchange
+        position_book.live = False
+        position_book.replace([])
+
+        first_ts = last_ts = None
+        started = time.perf_counter()
+        for ts, payload in signals:
+            first_ts = ts if first_ts is None else first_ts
+            last_ts = ts
+            self._advance(ts)
+            position_book.replace(self.exchange.position_list())
+            legs = payload["legs"] if "legs" in payload else [payload]
+            for leg in legs:
+                await self._process(WebhookSignal(**leg))
+            await fill_tracker.drain()
+        self._advance(float("inf"))
+        elapsed = time.perf_counter() - started
+
+        return await self._report(elapsed, (last_ts - first_ts) if first_ts is not None else 0.0)
+
+    async def _process(self, signal: WebhookSignal):
+        if signal.symbol not in self.klines and signal.price:
+            self.exchange.set_price(signal.symbol, signal.price)
+        # Size and validate at the price the order will fill at
+        signal.price = self.exchange.prices.get(signal.symbol)
+
+        start = time.perf_counter()
+        async with async_session_maker() as db:
+            await self.handler.process_signal(signal, db, auto_trading_enabled=True)
+        self.latencies.append(time.perf_counter() - start)
+
+    def _advance(self, until: float):
+        """Apply every kline close up to a time, in time order per symbol"""
+        for symbol, (times, closes) in self.klines.items():
+            end = bisect_right(times, until)
+            for i in range(self._cursor[symbol], end):
+                self.exchange.set_price(symbol, closes[i])
+            self._cursor[symbol] = max(self._cursor[symbol], end)
+
+    async def _report(self, elapsed: float, span: float) -> Dict[str, Any]:
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(Trade.status, func.count()).group_by(Trade.status)
+            )
+            by_status = dict(result.all())
+            result = await session.execute(
+                select(Trade.reason, func.count())
+                .where(Trade.status == "rejected")
+                .group_by(Trade.reason)
+            )
+            # Reasons differ only in their numbers; count them as one
+            rejections: Dict[str, int] = {}
+            for reason, count in result.all():
+                key = re.sub(r"\d+(\.\d+)?", "#", reason or "")
+                rejections[key] = rejections.get(key, 0) + count
+
+        latencies = sorted(self.latencies)
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+
+        exchange = self.exchange
+        realized = sum(exchange.realized_by_symbol.values())
+        unrealized = exchange.unrealized_pnl()
+        return {
+            "signals": len(latencies),
+            "trades_by_status": by_status,
+            "rejections": dict(sorted(rejections.items(), key=lambda item: -item[1])),
+            "elapsed_s": elapsed,
+            "signals_per_s": len(latencies) / elapsed if elapsed else 0.0,
+            "speedup": span / elapsed if elapsed else 0.0,
+            "latency_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "p99": percentile(0.99)},
+            "fills": exchange.fills,
+            "stops_triggered": exchange.triggered,
+            "realized_pnl": realized,
+            "fees": exchange.fees,
+            "unrealized_pnl": unrealized,
+            "net_pnl": realized - exchange.fees + unrealized,
+            "final_equity": exchange.balance + unrealized,
+            "realized_by_symbol": exchange.realized_by_symbol,
+            "settings": settings_store.as_dict()
+        }
+
+async def backfill_journal(path: str):
+    """Write a journal from the webhook_data of recorded primary-account trades.
+
+    Each row becomes one entry (batch legs individually), stamped with the
+    row's created_at.
+    """
+    count = 0
+    with open(path, "w") as file:
+        async with async_session_maker() as session:
+            result = await session.stream(
+                select(Trade.created_at, Trade.webhook_data)
+                .where(Trade.webhook_data.is_not(None), Trade.account.is_(None))
+                .order_by(Trade.created_at, Trade.id)
+            )
+            async for created_at, webhook_data in result:
+                # created_at is naive UTC
+                ts = created_at.replace(tzinfo=timezone.utc).timestamp() if created_at else 0.0
+                line = json.dumps({"ts": ts, "signal": json.loads(webhook_data)}, separators=(",", ":"))
+                file.write(line + "\n")
+                count += 1
+    return count
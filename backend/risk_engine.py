@@ -0,0 +1,130 @@
+from position_book import PositionBook, position_book
+from ticker_stream import ticker_cache
+from settings_store import settings_store
+from typing import Dict, Any, Optional, Tuple
+from config import config
+import metrics
+
+class RiskEngine:
+    """Pre-trade limits, checked in memory before an order is sent.
+
+    Exposure is the position book (kept live by the private stream) plus
+    the orders this process has placed that the book may not show yet.
+    Those are reserved when they pass the check and released once the
+    fill tracker has settled them. Limits:
+
+    - ``max_position_size`` (settings): USDT notional per symbol
+    - ``MAX_POSITIONS``: symbols with an open position
+    - ``MAX_GROSS_EXPOSURE``: USDT notional across symbols (0 disables)
+
+    Orders that reduce a position always pass. Orders that add to one are
+    rejected when no price is known, as their notional cannot be checked.
+
+    Each account has its own engine over its own ``book``; the default is
+    the primary account's.
+    """
+
+    def __init__(self, max_positions: int, max_gross_exposure: float,
+                 book: Optional[PositionBook] = None):
+        self.book = book or position_book
+        self.max_positions = max_positions
+        self.max_gross_exposure = max_gross_exposure
+        # trade row id: (symbol, signed quantity, price at the check)
+        self._reserved: Dict[int, Tuple[str, float, Optional[float]]] = {}
+
+    def check(self, trade_id: int, symbol: str, side: str, qty: float,
+              price: Optional[float] = None) -> Optional[str]:
+        """Reserve the order if it is within limits, else return the reason"""
+        order_qty = qty if side.lower() == "buy" else -qty
+        current_qty = self._signed_qty(symbol)
+        new_qty = current_qty + order_qty
+
+        # Reducing (without flipping past the old size) never adds risk
+        if abs(new_qty) <= abs(current_qty) and current_qty * new_qty >= 0:
+            self._reserved[trade_id] = (symbol, order_qty, price)
+            return None
+
+        if current_qty == 0 and self._open_symbols() >= self.max_positions:
+            return self._reject("max_positions", f"Max open positions reached ({self.max_positions})")
+
+        # The notional limits cannot be checked without a price
+        price = self._price(symbol) or price
+        if not price:
+            return self._reject("no_price", f"No price for {symbol} to check the notional limits")
+
+        notional = abs(new_qty) * price
+        if notional > settings_store.max_position_size:
+            return self._reject(
+                "max_position_size",
+                f"Position notional {notional:.2f} would exceed max position size "
+                f"{settings_store.max_position_size:.2f}"
+            )
+        if self.max_gross_exposure:
+            gross = self.gross_exposure() + (abs(new_qty) - abs(current_qty)) * price
+            if gross > self.max_gross_exposure:
+                return self._reject(
+                    "max_gross_exposure",
+                    f"Gross exposure {gross:.2f} would exceed {self.max_gross_exposure:.2f}"
+                )
+
+        self._reserved[trade_id] = (symbol, order_qty, price)
+        return None
+
+    def release(self, trade_id: int):
+        """Drop a reservation once the order failed or its fill was settled"""
+        self._reserved.pop(trade_id, None)
+
+    def gross_exposure(self) -> float:
+        """USDT notional of every symbol, reserved orders included"""
+        symbols = {pos["symbol"] for pos in self.book.all()}
+        symbols.update(symbol for symbol, _, _ in self._reserved.values())
+        total = 0.0
+        for symbol in symbols:
+            price = self._price(symbol)
+            if price:
+                total += abs(self._signed_qty(symbol)) * price
+        return total
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "open_positions": self._open_symbols(),
+            "max_positions": self.max_positions,
+            "gross_exposure": self.gross_exposure(),
+            "max_gross_exposure": self.max_gross_exposure or None,
+            "max_position_size": settings_store.max_position_size,
+            "reserved_orders": len(self._reserved)
+        }
+
+    def _signed_qty(self, symbol: str) -> float:
+        position = self.book.get(symbol)
+        qty = 0.0
+        if position:
+            qty = position["size"] if position["side"].lower() == "buy" else -position["size"]
+        for reserved_symbol, reserved_qty, _ in self._reserved.values():
+            if reserved_symbol == symbol:
+                qty += reserved_qty
+        return qty
+
+    def _open_symbols(self) -> int:
+        symbols = {pos["symbol"] for pos in self.book.all()}
+        symbols.update(symbol for symbol, _, _ in self._reserved.values())
+        return sum(1 for symbol in symbols if self._signed_qty(symbol) != 0)
+
+    def _price(self, symbol: str) -> Optional[float]:
+        """Streamed mark price, else the last one the book or a check saw"""
+        price = ticker_cache.price(symbol)
+        if price:
+            return price
+        position = self.book.get(symbol)
+        if position:
+            return position.get("current_price") or position["entry_price"]
+        for reserved_symbol, _, reserved_price in self._reserved.values():
+            if reserved_symbol == symbol and reserved_price:
+                return reserved_price
+        return None
+
+    def _reject(self, rule: str, reason: str) -> str:
+        metrics.risk_rejections_total.inc(rule=rule)
+        return f"Risk limit: {reason}"
+
+risk_engine = RiskEngine(config.MAX_POSITIONS, config.MAX_GROSS_EXPOSURE)
@@ -0,0 +1,51 @@
+from models import Settings, SettingsUpdate
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, Optional
+
+class SettingsStore:
+    """Process-wide snapshot of the settings row.
+
+    Loaded once by init_db and updated in place by ``update``, which writes
+    through to the database, so readers never need a query.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        self.auto_trading_enabled = True
+        self.max_position_size = 1000.0
+        self.risk_percentage = 1.0
+
+    def load(self, settings: Settings):
+        """Replace the snapshot with the values of a settings row"""
+        self.auto_trading_enabled = settings.auto_trading_enabled
+        self.max_position_size = settings.max_position_size
+        self.risk_percentage = settings.risk_percentage
+        self.loaded = True
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "auto_trading_enabled": self.auto_trading_enabled,
+            "max_position_size": self.max_position_size,
+            "risk_percentage": self.risk_percentage
+        }
+
+    async def update(self, db: AsyncSession,
+                     settings_update: SettingsUpdate) -> Optional[Dict[str, Any]]:
+        """Apply changes to the database row and then to the snapshot"""
+        settings = await db.get(Settings, 1)
+        if not settings:
+            return None
+
+        if settings_update.auto_trading_enabled is not None:
+            settings.auto_trading_enabled = settings_update.auto_trading_enabled
+        if settings_update.max_position_size is not None:
+            settings.max_position_size = settings_update.max_position_size
+        if settings_update.risk_percentage is not None:
+            settings.risk_percentage = settings_update.risk_percentage
+
+        await db.commit()
+        await db.refresh(settings)
+        self.load(settings)
+        return self.as_dict()
+
+settings_store = SettingsStore()
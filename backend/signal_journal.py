@@ -0,0 +1,61 @@
+from logger import get_logger
+from typing import Any, Dict, Iterator, Optional, Tuple
+from config import config
+import json
+import mmap
+import os
+import time
+
+logger = get_logger(__name__)
+
+class SignalJournal:
+    """Append-only log of recorded webhook signals, one JSON line each.
+
+    Lines look like ``{"ts": 1700000000.123, "signal": {...}}`` where
+    ``signal`` is the payload as received, single or batch. The file is
+    line buffered, so each signal costs one write and no fsync. Replay it
+    with ``read_journal`` (see replay.py).
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._file = None
+
+    def append(self, payload: Dict[str, Any], ts: Optional[float] = None):
+        if not self.path:
+            return
+        try:
+            if self._file is None:
+                self._file = open(self.path, "a", buffering=1)
+            line = json.dumps({"ts": time.time() if ts is None else ts, "signal": payload}, separators=(",", ":"))
+            self._file.write(line + "\n")
+        except OSError as e:
+            # The trade is already recorded; losing a journal line is not fatal
+            logger.error("Cannot write signal journal %s: %s", self.path, e)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def read_journal(path: str, start: Optional[float] = None,
+                 end: Optional[float] = None) -> Iterator[Tuple[float, Dict[str, Any]]]:
+    """Yield (timestamp, payload) in file order, memory-mapping the journal"""
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as journal:
+            for line in iter(journal.readline, b""):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn last line after a crash
+                    logger.warning("Skipping unreadable journal line in %s", path)
+                    continue
+                ts = entry["ts"]
+                if (start is None or ts >= start) and (end is None or ts < end):
+                    yield ts, entry["signal"]
+
+signal_journal = SignalJournal(config.SIGNAL_JOURNAL_PATH)
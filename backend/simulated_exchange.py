@@ -0,0 +1,190 @@
+from typing import Any, Callable, Dict, List, Optional
+import itertools
+import time
+
+class SimulatedExchange:
+    """In-memory stand-in for BybitClient, for replays and load tests.
+
+    Market orders fill in full at once at the current price of the symbol
+    (one-way positions, taker fee on the notional). A position's stop loss
+    and take profit, taken from the order that opened it, close it when a
+    later price crosses them. Orders and closed-PnL records are kept in the
+    v5 response shapes; ``on_fill`` receives each filled order.
+    """
+
+    def __init__(self, balance: float, fee_rate: float = 0.00055,
+                 on_fill: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.balance = balance
+        self.fee_rate = fee_rate
+        self.on_fill = on_fill
+        self.prices: Dict[str, float] = {}
+        # symbol: {"qty": signed size, "entry_price", "leverage", "stop_loss", "take_profit"}
+        self.positions: Dict[str, Dict[str, Any]] = {}
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self.closed_pnl: List[Dict[str, Any]] = []
+        self.leverage_cache: Dict[str, float] = {}
+        self.realized_by_symbol: Dict[str, float] = {}
+        self.fees = 0.0
+        self.fills = 0
+        self.triggered = 0
+        self._ids = itertools.count(1)
+
+    def set_price(self, symbol: str, price: float):
+        self.prices[symbol] = price
+        position = self.positions.get(symbol)
+        if position is None:
+            return
+        is_long = position["qty"] > 0
+        stop, target = position["stop_loss"], position["take_profit"]
+        close_side = "Sell" if is_long else "Buy"
+        if stop and (price <= stop if is_long else price >= stop):
+            self.execute(symbol, close_side, abs(position["qty"]), stop, stopOrderType="StopLoss")
+            self.triggered += 1
+        elif target and (price >= target if is_long else price <= target):
+            self.execute(symbol, close_side, abs(position["qty"]), target, stopOrderType="TakeProfit")
+            self.triggered += 1
+
+    def unrealized_pnl(self) -> float:
+        return sum(
+            (self.prices.get(symbol, pos["entry_price"]) - pos["entry_price"]) * pos["qty"]
+            for symbol, pos in self.positions.items()
+        )
+
+    def invalidate_account_state(self):
+        pass
+
+    async def check_connection(self) -> Dict[str, Any]:
+        return {"connected": True}
+
+    async def get_account_info(self) -> Dict[str, Any]:
+        return {
+            "success": True,
+            "balance": self.balance,
+            "equity": self.balance + self.unrealized_pnl(),
+            "available_balance": self.balance
+        }
+
+    async def get_ticker_price(self, symbol: str) -> Optional[float]:
+        return self.prices.get(symbol)
+
+    async def ensure_leverage(self, symbol: str, leverage: Optional[int]) -> Dict[str, Any]:
+        if leverage and leverage > 0:
+            self.leverage_cache[symbol] = float(leverage)
+        return {"success": True, "message": "Leverage unchanged"}
+
+    async def place_order(self, symbol: str, side: str, qty: float,
+                          leverage: Optional[int] = None,
+                          stop_loss: Optional[float] = None,
+                          take_profit: Optional[float] = None) -> Dict[str, Any]:
+        price = self.prices.get(symbol)
+        if not price:
+            return {"success": False, "error": f"No price for {symbol}"}
+        await self.ensure_leverage(symbol, leverage)
+        order = self.execute(symbol, side, qty, price, stop_loss=stop_loss, take_profit=take_profit)
+        return {"success": True, "order_id": order["orderId"], "data": {"orderId": order["orderId"]}}
+
+    async def get_order(self, symbol: str, order_id: str) -> Optional[Dict[str, Any]]:
+        return self.orders.get(order_id)
+
+    async def fetch_positions(self) -> Optional[List[Dict[str, Any]]]:
+        return self.position_list()
+
+    async def get_positions(self) -> List[Dict[str, Any]]:
+        return self.position_list()
+
+    def position_list(self) -> List[Dict[str, Any]]:
+        """Open positions in the position book's shape"""
+        positions = []
+        for symbol, pos in self.positions.items():
+            price = self.prices.get(symbol, pos["entry_price"])
+            pnl = (price - pos["entry_price"]) * pos["qty"]
+            margin = abs(pos["qty"]) * pos["entry_price"] / pos["leverage"]
+            positions.append({
+                "symbol": symbol,
+                "side": "Buy" if pos["qty"] > 0 else "Sell",
+                "size": abs(pos["qty"]),
+                "leverage": pos["leverage"],
+                "entry_price": pos["entry_price"],
+                "current_price": price,
+                "pnl": pnl,
+                "pnl_percentage": pnl / margin * 100 if margin else 0
+            })
+        return positions
+
+    def execute(self, symbol: str, side: str, qty: float, price: float,
+                stop_loss: Optional[float] = None, take_profit: Optional[float] = None,
+                **extra: Any) -> Dict[str, Any]:
+        """Fill a market order and record it; returns the order"""
+        signed_qty = qty if side.lower() == "buy" else -qty
+        pnl = self._fill(symbol, signed_qty, price)
+        position = self.positions.get(symbol)
+        if position and (stop_loss or take_profit):
+            position["stop_loss"] = stop_loss
+            position["take_profit"] = take_profit
+
+        now_ms = str(int(time.time() * 1000))
+        order = {
+            "orderId": f"sim-{next(self._ids)}",
+            "symbol": symbol,
+            "side": side.capitalize(),
+            "orderType": "Market",
+            "orderStatus": "Filled",
+            "qty": str(qty),
+            "cumExecQty": str(qty),
+            "avgPrice": str(price),
+            "createdTime": now_ms,
+            "updatedTime": now_ms,
+            **extra
+        }
+        self.orders[order["orderId"]] = order
+        if pnl is not None:
+            self.closed_pnl.append({
+                "orderId": order["orderId"],
+                "symbol": symbol,
+                "side": order["side"],
+                "qty": str(qty),
+                "avgExitPrice": str(price),
+                "closedPnl": str(pnl),
+                "createdTime": now_ms
+            })
+        if self.on_fill:
+            self.on_fill(order)
+        return order
+
+    def _fill(self, symbol: str, signed_qty: float, price: float) -> Optional[float]:
+        """Apply a fill to the position; returns the PnL booked if it closed any"""
+        self.fills += 1
+        fee = abs(signed_qty) * price * self.fee_rate
+        self.fees += fee
+        self.balance -= fee
+
+        position = self.positions.get(symbol)
+        current = position["qty"] if position else 0.0
+        pnl = None
+        if current and current * signed_qty < 0:
+            closed = min(abs(signed_qty), abs(current))
+            pnl = (price - position["entry_price"]) * closed * (1 if current > 0 else -1)
+            self.balance += pnl
+            self.realized_by_symbol[symbol] = self.realized_by_symbol.get(symbol, 0.0) + pnl
+
+        new_qty = current + signed_qty
+        if abs(new_qty) < 1e-12:
+            self.positions.pop(symbol, None)
+        elif current == 0 or current * new_qty < 0:
+            # Opened, or flipped through zero: a fresh position at this price
+            self.positions[symbol] = {
+                "qty": new_qty,
+                "entry_price": price,
+                "leverage": self.leverage_cache.get(symbol, 1.0),
+                "stop_loss": None,
+                "take_profit": None
+            }
+        elif abs(new_qty) > abs(current):
+            # Added to: average the entry price
+            position["entry_price"] = (
+                position["entry_price"] * abs(current) + price * abs(signed_qty)
+            ) / abs(new_qty)
+            position["qty"] = new_qty
+        else:
+            position["qty"] = new_qty
+        return pnl
@@ -0,0 +1,178 @@
+from bybit_client import bybit_client
+from position_book import position_book
+from typing import Dict, Any, Iterable, List, Optional, Set
+from config import config
+from logger import get_logger
+import websockets
+import asyncio
+import json
+import time
+
+logger = get_logger(__name__)
+
+BYBIT_WS_PUBLIC_MAINNET = "wss://stream.bybit.com/v5/public/linear"
+BYBIT_WS_PUBLIC_TESTNET = "wss://stream-testnet.bybit.com/v5/public/linear"
+
+class Ticker:
+    """Latest prices for one symbol"""
+    __slots__ = ("mark_price", "last_price", "updated_at")
+
+    def __init__(self):
+        self.mark_price = 0.0
+        self.last_price = 0.0
+        self.updated_at = 0.0
+
+class TickerCache:
+    """Mark prices from the public ticker stream.
+
+    Only symbols that are held (position book) or were signaled within
+    ``signal_ttl`` seconds are subscribed; the set is re-synced every
+    ``sync_interval`` seconds. Each tick re-marks the held position.
+    """
+
+    def __init__(self, url: Optional[str] = None, signal_ttl: float = 900.0,
+                 max_age: float = 30.0, sync_interval: float = 10.0):
+        self.url = url or (
+            BYBIT_WS_PUBLIC_TESTNET if bybit_client.testnet else BYBIT_WS_PUBLIC_MAINNET
+        )
+        self.signal_ttl = signal_ttl
+        self.max_age = max_age
+        self.sync_interval = sync_interval
+        self.tickers: Dict[str, Ticker] = {}
+        self._signaled: Dict[str, float] = {}
+        self._subscribed: Set[str] = set()
+        self._ws = None
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+
+    def price(self, symbol: str) -> Optional[float]:
+        """Fresh mark price for a symbol, or None if not streamed"""
+        ticker = self.tickers.get(symbol)
+        if ticker is None or time.time() - ticker.updated_at > self.max_age:
+            return None
+        return ticker.mark_price or ticker.last_price or None
+
+    async def fetch_price(self, symbol: str, client=None) -> Optional[float]:
+        """Streamed price, else one read from REST and kept until the stream takes over"""
+        price = self.price(symbol)
+        if price:
+            return price
+        price = await (client or bybit_client).get_ticker_price(symbol)
+        if price:
+            ticker = self.tickers.get(symbol)
+            if ticker is None:
+                ticker = self.tickers[symbol] = Ticker()
+            ticker.mark_price = price
+            ticker.updated_at = time.time()
+        return price
+
+    def watch(self, symbol: str):
+        """Keep a signaled symbol subscribed for the next signal_ttl seconds"""
+        self._signaled[symbol] = time.time()
+        if self._ws is not None and symbol not in self._subscribed:
+            task = asyncio.create_task(self._subscribe(self._ws, [symbol]))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _wanted(self) -> Set[str]:
+        cutoff = time.time() - self.signal_ttl
+        for symbol in [s for s, at in self._signaled.items() if at < cutoff]:
+            del self._signaled[symbol]
+        return set(position_book.positions) | set(self._signaled)
+
+    async def _send_op(self, ws, op: str, symbols: Iterable[str]):
+        args = [f"tickers.{symbol}" for symbol in symbols]
+        # Keep requests small; Bybit limits the size of one subscribe message
+        for i in range(0, len(args), 10):
+            await ws.send(json.dumps({"op": op, "args": args[i:i + 10]}))
+
+    async def _subscribe(self, ws, symbols: List[str]):
+        symbols = [s for s in symbols if s not in self._subscribed]
+        if not symbols:
+            return
+        self._subscribed.update(symbols)
+        try:
+            await self._send_op(ws, "subscribe", symbols)
+        except Exception as e:
+            logger.warning("Ticker subscribe failed: %s", e)
+
+    async def _sync(self, ws):
+        wanted = self._wanted()
+        stale = self._subscribed - wanted
+        if stale:
+            self._subscribed -= stale
+            await self._send_op(ws, "unsubscribe", sorted(stale))
+            for symbol in stale:
+                self.tickers.pop(symbol, None)
+        await self._subscribe(ws, sorted(wanted))
+
+    async def _run(self):
+        delay = 1
+        while True:
+            try:
+                async with websockets.connect(self.url, ping_interval=None, close_timeout=5) as ws:
+                    self._ws = ws
+                    self._subscribed = set()
+                    delay = 1
+                    await self._sync(ws)
+
+                    last_ping = last_sync = time.monotonic()
+                    while True:
+                        try:
+                            raw = await asyncio.wait_for(ws.recv(), 1)
+                            self._dispatch(json.loads(raw))
+                        except asyncio.TimeoutError:
+                            pass
+
+                        now = time.monotonic()
+                        if now - last_ping >= 20:
+                            await ws.send(json.dumps({"op": "ping"}))
+                            last_ping = now
+                        if now - last_sync >= self.sync_interval:
+                            await self._sync(ws)
+                            last_sync = now
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Ticker stream error: %s", e)
+            finally:
+                self._ws = None
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60)
+
+    def _dispatch(self, message: Dict[str, Any]):
+        topic = message.get("topic", "")
+        if not topic.startswith("tickers."):
+            return
+
+        data = message.get("data") or {}
+        symbol = data.get("symbol") or topic[len("tickers."):]
+        ticker = self.tickers.get(symbol)
+        if ticker is None:
+            ticker = self.tickers[symbol] = Ticker()
+
+        # Deltas only carry the fields that changed
+        if data.get("markPrice"):
+            ticker.mark_price = float(data["markPrice"])
+        if data.get("lastPrice"):
+            ticker.last_price = float(data["lastPrice"])
+        ticker.updated_at = time.time()
+
+        if ticker.mark_price:
+            position_book.mark(symbol, ticker.mark_price)
+
+ticker_cache = TickerCache(
+    url=config.BYBIT_WS_PUBLIC_URL,
+    signal_ttl=config.TICKER_SIGNAL_TTL
+)
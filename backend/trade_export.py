@@ -0,0 +1,103 @@
+from models import Trade
+from database import async_session_maker
+from sqlalchemy.sql import Select
+from typing import AsyncIterator, List, Sequence
+import pyarrow as pa
+import pyarrow.parquet as pq
+import csv
+import io
+
+# Same columns as TradeResponse plus updated_at
+EXPORT_COLUMNS = [
+    Trade.id, Trade.trade_id, Trade.symbol, Trade.side, Trade.quantity,
+    Trade.leverage, Trade.entry_price, Trade.stop_loss, Trade.take_profit,
+    Trade.status, Trade.reason, Trade.pnl, Trade.account, Trade.created_at,
+    Trade.updated_at
+]
+
+PARQUET_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("trade_id", pa.string()),
+    ("symbol", pa.string()),
+    ("side", pa.string()),
+    ("quantity", pa.float64()),
+    ("leverage", pa.int64()),
+    ("entry_price", pa.float64()),
+    ("stop_loss", pa.float64()),
+    ("take_profit", pa.float64()),
+    ("status", pa.string()),
+    ("reason", pa.string()),
+    ("pnl", pa.float64()),
+    ("account", pa.string()),
+    ("created_at", pa.timestamp("us")),
+    ("updated_at", pa.timestamp("us")),
+])
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain.
+
+    ``tell`` keeps counting across drains, so the Parquet footer offsets
+    stay correct although the bytes have already been sent.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+async def _row_chunks(query: Select, chunk_size: int) -> AsyncIterator[Sequence]:
+    """Rows in chunks from a server-side cursor, in a session of its own.
+
+    The response is streamed after the endpoint returns, so the request's
+    session cannot be used here.
+    """
+    query = query.with_only_columns(*EXPORT_COLUMNS)
+    async with async_session_maker() as session:
+        result = await session.stream(query.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions(chunk_size):
+            yield rows
+
+async def stream_csv(query: Select, chunk_size: int) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in EXPORT_COLUMNS])
+    async for rows in _row_chunks(query, chunk_size):
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only when there are no trades
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+async def stream_parquet(query: Select, chunk_size: int) -> AsyncIterator[bytes]:
+    """One row group per chunk; the footer is written when the rows run out"""
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, PARQUET_SCHEMA, compression="snappy")
+    try:
+        async for rows in _row_chunks(query, chunk_size):
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, PARQUET_SCHEMA)],
+                schema=PARQUET_SCHEMA
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
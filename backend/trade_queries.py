@@ -0,0 +1,44 @@
+from models import Trade
+from sqlalchemy import select, desc, tuple_
+from sqlalchemy.sql import Select
+from datetime import datetime
+from typing import Optional, Tuple
+import base64
+
+def encode_cursor(trade: Trade) -> str:
+    """Opaque cursor pointing just past a trade in (created_at, id) order"""
+    raw = f"{trade.created_at.isoformat()}|{trade.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Raises ValueError for a malformed cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, trade_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), int(trade_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def trade_history_query(symbol: Optional[str] = None,
+                        status: Optional[str] = None,
+                        start: Optional[datetime] = None,
+                        end: Optional[datetime] = None,
+                        cursor: Optional[str] = None) -> Select:
+    """Newest-first trade query served by the (created_at, id) indexes.
+
+    Paging seeks past the cursor instead of using OFFSET, so every page
+    costs the same however deep it is.
+    """
+    query = select(Trade)
+    if symbol:
+        query = query.where(Trade.symbol == symbol)
+    if status:
+        query = query.where(Trade.status == status)
+    if start:
+        query = query.where(Trade.created_at >= start)
+    if end:
+        query = query.where(Trade.created_at < end)
+    if cursor:
+        created_at, trade_id = decode_cursor(cursor)
+        query = query.where(tuple_(Trade.created_at, Trade.id) < tuple_(created_at, trade_id))
+    return query.order_by(desc(Trade.created_at), desc(Trade.id))
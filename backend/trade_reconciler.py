@@ -0,0 +1,194 @@
+from bybit_client import bybit_client
+from accounts import account_registry
+from database import async_session_maker, write_lock
+from models import Trade, SyncState
+from dashboard import dashboard_hub
+from fill_tracker import apply_order_update, FINAL_ORDER_STATES
+from analytics import analytics
+from logger import get_logger
+from sqlalchemy import select
+from typing import Dict, Any, List, Optional, Tuple
+from config import config
+import asyncio
+import time
+
+logger = get_logger(__name__)
+
+# Bybit accepts at most seven days between startTime and endTime
+MAX_WINDOW_MS = 7 * 24 * 3600 * 1000
+
+# Matched against trades.trade_id in chunks, keeping IN lists short
+MATCH_CHUNK = 500
+
+class TradeReconciler:
+    """Brings trade rows in line with the exchange in the background.
+
+    Each pass reads only the order history and closed-PnL records since a
+    high-water mark kept in the sync_state table, matches them to trades
+    through the trade_id index and writes the changed rows together with
+    the new marks in one transaction. The marks are rewound by an overlap
+    so records that show up late on the exchange are not missed.
+
+    Fan-out accounts are reconciled the same way against their own
+    history, with their marks kept as ``<source>@<account>``.
+    """
+
+    # sync_state name: (client method name, page size)
+    SOURCES = {
+        "order_history": ("get_order_history_page", 50),
+        "closed_pnl": ("get_closed_pnl_page", 100),
+    }
+
+    def __init__(self, interval: float, overlap: float):
+        self.client = bybit_client
+        self.interval = interval
+        self.overlap_ms = int(overlap * 1000)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error("Trade reconciliation failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    async def reconcile(self) -> int:
+        """Run one pass over every account; returns the number of trades updated"""
+        updated = await self.reconcile_account(self.client)
+        for account in account_registry.targets():
+            try:
+                updated += await self.reconcile_account(account.client, account.name)
+            except Exception as e:
+                logger.error("Trade reconciliation failed: %s", e, extra={"account": account.name})
+        return updated
+
+    async def reconcile_account(self, client, account: Optional[str] = None) -> int:
+        """Run one pass for one account (None for the primary)"""
+        suffix = f"@{account}" if account else ""
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(SyncState).where(SyncState.name.in_([name + suffix for name in self.SOURCES]))
+            )
+            marks = {state.name: state.value for state in result.scalars()}
+
+        # Fetch outside any transaction; the exchange can be slow
+        now_ms = int(time.time() * 1000)
+        records: Dict[str, List[Dict[str, Any]]] = {}
+        for name, (method, limit) in self.SOURCES.items():
+            mark = marks.get(name + suffix)
+            # First run looks back one window rather than the whole history
+            since = int(mark) - self.overlap_ms if mark else now_ms - MAX_WINDOW_MS
+            fetched = await self._fetch_since(getattr(client, method), limit, since, now_ms)
+            if fetched is not None:
+                records[name] = fetched
+
+        # Held across the commit so a concurrent rebuild cannot miss or
+        # double count these PnL updates; the write lock covers the whole
+        # transaction, which starts writing at the first autoflush
+        async with analytics.lock, write_lock, async_session_maker() as session:
+            for name in records:
+                state = await session.get(SyncState, name + suffix)
+                if state is None:
+                    state = SyncState(name=name + suffix)
+                    session.add(state)
+                state.value = str(now_ms)
+
+            orders, pnl_by_order = self._collect(records)
+            order_ids = list(set(orders) | set(pnl_by_order))
+
+            changed = []
+            closed = []
+            for i in range(0, len(order_ids), MATCH_CHUNK):
+                result = await session.execute(
+                    select(Trade)
+                    .where(Trade.trade_id.in_(order_ids[i:i + MATCH_CHUNK]))
+                    .where(Trade.account == account if account else Trade.account.is_(None))
+                )
+                for trade in result.scalars():
+                    updated = False
+                    if trade.trade_id in orders:
+                        updated = apply_order_update(trade, orders[trade.trade_id])
+                    pnl = pnl_by_order.get(trade.trade_id)
+                    if pnl is not None and trade.pnl != pnl:
+                        closed.append((trade, trade.pnl))
+                        trade.pnl = pnl
+                        updated = True
+                    if updated:
+                        changed.append(trade)
+
+            # Trade updates and high-water marks land together or not at all
+            await session.commit()
+            for trade, previous_pnl in closed:
+                analytics.record_pnl(trade, previous_pnl)
+
+        for trade in changed:
+            dashboard_hub.publish_trade(trade)
+        if changed:
+            client.invalidate_account_state()
+            logger.info("Reconciled %d trades", len(changed), extra={
+                "account": account or account_registry.primary.name,
+                "trade_ids": [trade.id for trade in changed]
+            })
+        return len(changed)
+
+    def _collect(self, records: Dict[str, List[Dict[str, Any]]]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, float]]:
+        """Latest final state per order, and realised PnL per closing order"""
+        orders: Dict[str, Dict[str, Any]] = {}
+        for order in records.get("order_history", []):
+            if order.get("orderStatus") not in FINAL_ORDER_STATES:
+                continue
+            current = orders.get(order["orderId"])
+            if current is None or int(order.get("updatedTime") or 0) >= int(current.get("updatedTime") or 0):
+                orders[order["orderId"]] = order
+
+        # The overlap returns some records twice; count each one once
+        unique = {
+            (record["orderId"], record.get("createdTime")): float(record.get("closedPnl") or 0)
+            for record in records.get("closed_pnl", [])
+        }
+        pnl_by_order: Dict[str, float] = {}
+        for (order_id, _), pnl in unique.items():
+            pnl_by_order[order_id] = pnl_by_order.get(order_id, 0.0) + pnl
+        return orders, pnl_by_order
+
+    async def _fetch_since(self, fetch_page, limit: int, since_ms: int,
+                           until_ms: int) -> Optional[List[Dict[str, Any]]]:
+        """All records between two times, walking seven-day windows and pages"""
+        records = []
+        start = since_ms
+        while start < until_ms:
+            end = min(start + MAX_WINDOW_MS, until_ms)
+            params = {
+                "category": "linear",
+                "startTime": start,
+                "endTime": end,
+                "limit": limit
+            }
+            while True:
+                result = await fetch_page(params)
+                if result["retCode"] != 0:
+                    logger.error("Error reading %s: %s", fetch_page.__name__, result.get("retMsg"))
+                    return None
+                records.extend(result["result"]["list"])
+                cursor = result["result"].get("nextPageCursor")
+                if not cursor:
+                    break
+                params["cursor"] = cursor
+            start = end
+        return records
+
+trade_reconciler = TradeReconciler(
+    config.TRADE_RECONCILE_INTERVAL,
+    config.TRADE_RECONCILE_OVERLAP
+)
@@ -1,12 +1,29 @@
-from models import WebhookSignal, Trade
+from models import WebhookSignal, BatchWebhookSignal, Trade
 from bybit_client import bybit_client
+from fill_tracker import fill_tracker, apply_order_update, FINAL_ORDER_STATES
+from dashboard import dashboard_hub
+from ticker_stream import ticker_cache
+from instruments import instrument_cache
+from accounts import account_registry, Account
+from risk_engine import RiskEngine, risk_engine
+from settings_store import settings_store
+from database import async_session_maker, write_lock
+from group_commit import trade_writer
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import select
 import json
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
 import hashlib
 import hmac
+import time
 from config import config
+from logger import get_logger
+import metrics
+
+logger = get_logger(__name__)
 
 class WebhookHandler:
     def __init__(self):
@@ -21,12 +38,9 @@ class WebhookHandler:
         ).hexdigest()
         return hmac.compare_digest(expected_signature, signature)
     
-    async def process_signal(self, signal: WebhookSignal, db: AsyncSession, 
-                           auto_trading_enabled: bool) -> Dict[str, Any]:
-        """Process incoming webhook signal"""
-        
-        # Create trade record
-        trade = Trade(
+    def build_trade(self, signal: WebhookSignal) -> Trade:
+        """Create the pending trade record for a signal"""
+        return Trade(
             symbol=signal.symbol,
             side=signal.action.upper(),
             quantity=signal.quantity or config.DEFAULT_POSITION_SIZE,
@@ -36,6 +50,51 @@ class WebhookHandler:
             status="pending",
             webhook_data=signal.json()
         )
+    
+    async def record_signal(self, signal: WebhookSignal,
+                            auto_trading_enabled: bool,
+                            idempotency_key: Optional[str] = None) -> Trade:
+        """Persist a signal as a pending trade (or rejected if trading is off).
+        
+        Concurrent signals are committed together, see GroupCommitWriter.
+        """
+        trade = self.build_trade(signal)
+        trade.idempotency_key = idempotency_key
+        # Start streaming the price now so sizing finds it in memory
+        ticker_cache.watch(signal.symbol)
+        if not auto_trading_enabled:
+            trade.status = "rejected"
+            trade.reason = "Auto trading is disabled"
+        
+        await trade_writer.write([trade])
+        return trade
+    
+    async def record_batch(self, batch: BatchWebhookSignal,
+                           auto_trading_enabled: bool,
+                           idempotency_key: Optional[str] = None) -> List[Trade]:
+        """Persist every leg of a batch signal as a trade in one transaction"""
+        trades = []
+        for i, leg in enumerate(batch.legs):
+            trade = self.build_trade(leg)
+            if idempotency_key:
+                trade.idempotency_key = f"{idempotency_key}:{i}"
+            if not auto_trading_enabled:
+                trade.status = "rejected"
+                trade.reason = "Auto trading is disabled"
+            ticker_cache.watch(leg.symbol)
+            trades.append(trade)
+        
+        await trade_writer.write(trades)
+        return trades
+    
+    async def process_signal(self, signal: WebhookSignal, db: AsyncSession, 
+                           auto_trading_enabled: bool) -> Dict[str, Any]:
+        """Process incoming webhook signal"""
+        received_at = time.perf_counter()
+        
+        # Create trade record
+        trade = self.build_trade(signal)
+        ticker_cache.watch(signal.symbol)
         
         # Check if auto trading is enabled
         if not auto_trading_enabled:
@@ -49,69 +108,362 @@ class WebhookHandler:
                 "trade_id": trade.id
             }
         
+        # The risk engine reserves exposure by trade row id
+        db.add(trade)
+        await db.flush()
+        return await self.execute_signal(trade, signal, db, received_at)
+    
+    async def execute_queued(self, trade_id: int, signal: WebhookSignal,
+                             received_at: Optional[float] = None) -> Dict[str, Any]:
+        """Execute a trade recorded by record_signal (called by the order queue).
+        
+        With fan-out accounts configured, the signal is placed on every
+        account at the same time and the result is reported per account.
+        """
+        targets = account_registry.targets()
+        if not targets:
+            return await self.execute_recorded(trade_id, signal, received_at)
+        
+        results = await asyncio.gather(
+            self.execute_recorded(trade_id, signal, received_at),
+            *(self.execute_copy(trade_id, signal, account, received_at) for account in targets)
+        )
+        names = [account_registry.primary.name] + [account.name for account in targets]
+        return {
+            "success": all(result["success"] for result in results),
+            "accounts": dict(zip(names, results))
+        }
+    
+    async def execute_recorded(self, trade_id: int, signal: WebhookSignal,
+                               received_at: Optional[float] = None,
+                               account: Optional[Account] = None) -> Dict[str, Any]:
+        """Execute an already recorded trade in a session of its own"""
+        async with async_session_maker() as db:
+            trade = await db.get(Trade, trade_id)
+            if not trade:
+                return {
+                    "success": False,
+                    "message": f"Trade {trade_id} not found",
+                    "trade_id": trade_id
+                }
+            
+            try:
+                return await self.execute_signal(trade, signal, db, received_at, account)
+            except Exception as e:
+                logger.exception("Error executing trade", extra={"trade_id": trade_id})
+                (account or account_registry.primary).risk.release(trade_id)
+                await db.rollback()
+                trade.status = "rejected"
+                trade.reason = f"Execution error: {str(e)}"
+                async with write_lock:
+                    await db.commit()
+                dashboard_hub.publish_trade(trade)
+                return {
+                    "success": False,
+                    "message": trade.reason,
+                    "trade_id": trade.id
+                }
+    
+    async def execute_copy(self, parent_id: int, signal: WebhookSignal, account: Account,
+                           received_at: Optional[float] = None) -> Dict[str, Any]:
+        """Record and execute the copy of a primary trade on a fan-out account"""
+        async with async_session_maker() as db:
+            parent = await db.get(Trade, parent_id)
+            if not parent:
+                return {
+                    "success": False,
+                    "message": f"Trade {parent_id} not found",
+                    "trade_id": parent_id
+                }
+            
+            trade = self.build_trade(signal)
+            trade.account = account.name
+            if parent.idempotency_key:
+                trade.idempotency_key = f"{parent.idempotency_key}@{account.name}"
+            db.add(trade)
+            try:
+                async with write_lock:
+                    await db.commit()
+            except IntegrityError:
+                # This signal was already copied to the account
+                await db.rollback()
+                return {
+                    "success": True,
+                    "duplicate": True,
+                    "message": "Copy already recorded"
+                }
+        
+        return await self.execute_recorded(trade.id, signal, received_at, account)
+    
+    async def prepare_trade(self, trade: Trade, signal: WebhookSignal,
+                            account: Optional[Account] = None) -> Optional[str]:
+        """Size the trade and round it to the instrument rules.
+        
+        Returns the rejection reason if the order is invalid.
+        """
+        client = account.client if account else self.client
+        price = signal.price or await ticker_cache.fetch_price(signal.symbol, client)
+        
+        # Calculate position size based on risk if not provided
+        if not signal.quantity:
+            # Sizes are USDT notionals; without a price there is no quantity
+            if not price:
+                return f"No price for {signal.symbol} to size the order"
+            account_info = await client.get_account_info()
+            if account_info["success"]:
+                # Risk percentage of the balance, in contracts at the current price
+                notional = account_info["balance"] * settings_store.risk_percentage / 100
+            else:
+                notional = config.DEFAULT_POSITION_SIZE
+            trade.quantity = notional / price
+        if account:
+            trade.quantity *= account.multiplier
+        
+        # Round to the instrument rules; invalid orders never reach the exchange
+        prepared = instrument_cache.prepare_order(
+            signal.symbol,
+            trade.quantity,
+            price=price,
+            leverage=signal.leverage,
+            stop_loss=signal.stop_loss,
+            take_profit=signal.take_profit
+        )
+        if not prepared["success"]:
+            return f"Order invalid: {prepared['error']}"
+        
+        trade.quantity = prepared["qty"]
+        trade.stop_loss = prepared["stop_loss"]
+        trade.take_profit = prepared["take_profit"]
+        return None
+    
+    def check_risk(self, trade: Trade, signal: WebhookSignal,
+                   risk: RiskEngine = risk_engine) -> Optional[str]:
+        """Check a sized trade against an account's pre-trade limits; no exchange call"""
+        return risk.check(
+            trade.id,
+            trade.symbol,
+            trade.side,
+            trade.quantity,
+            price=signal.price or ticker_cache.price(signal.symbol)
+        )
+    
+    async def execute_batch_queued(self, trade_ids: List[int],
+                                   batch: BatchWebhookSignal,
+                                   received_at: Optional[float] = None) -> Dict[str, Any]:
+        """Execute a batch recorded by record_batch (called by the order queue)"""
+        async with async_session_maker() as db:
+            result = await db.execute(select(Trade).where(Trade.id.in_(trade_ids)))
+            trades_by_id = {trade.id: trade for trade in result.scalars()}
+            legs = [
+                (trades_by_id[trade_id], leg)
+                for trade_id, leg in zip(trade_ids, batch.legs)
+                if trade_id in trades_by_id
+            ]
+            
+            try:
+                return await self.execute_batch(legs, db, received_at)
+            except Exception as e:
+                logger.exception("Error executing batch", extra={"trade_ids": trade_ids})
+                for trade_id in trade_ids:
+                    risk_engine.release(trade_id)
+                await db.rollback()
+                for trade, _ in legs:
+                    trade.status = "rejected"
+                    trade.reason = f"Execution error: {str(e)}"
+                async with write_lock:
+                    await db.commit()
+                return {
+                    "success": False,
+                    "message": f"Execution error: {str(e)}",
+                    "trade_ids": trade_ids
+                }
+    
+    async def execute_batch(self, legs: List[Tuple[Trade, WebhookSignal]],
+                            db: AsyncSession,
+                            received_at: Optional[float] = None) -> Dict[str, Any]:
+        """Place all legs through batch order calls and record the results.
+        
+        Leverage changes for distinct symbols run concurrently, the legs are
+        sent in create-batch calls, and all trade rows are written in a
+        single commit.
+        """
+        all_trades = [trade for trade, _ in legs]
+        
+        ready = []
+        with metrics.webhook_stage_seconds.time(stage="connection_check"):
+            connection = await self.client.check_connection()
+        if not connection["connected"]:
+            for trade in all_trades:
+                trade.status = "rejected"
+                trade.reason = f"Bybit connection failed: {connection.get('error', 'Unknown error')}"
+        else:
+            for trade, leg in legs:
+                with metrics.webhook_stage_seconds.time(stage="sizing"):
+                    error = await self.prepare_trade(trade, leg)
+                if not error:
+                    # Legs reserve in turn, so they count against each other
+                    with metrics.webhook_stage_seconds.time(stage="risk"):
+                        error = self.check_risk(trade, leg)
+                if error:
+                    trade.status = "rejected"
+                    trade.reason = error
+                else:
+                    ready.append((trade, leg))
+        
+        # One leverage change per symbol; the first leg's value wins
+        leverage_by_symbol = {}
+        for _, leg in ready:
+            leverage_by_symbol.setdefault(leg.symbol, leg.leverage)
+        symbols = list(leverage_by_symbol)
+        with metrics.webhook_stage_seconds.time(stage="leverage"):
+            leverage_results = await asyncio.gather(*(
+                self.client.ensure_leverage(symbol, leverage_by_symbol[symbol])
+                for symbol in symbols
+            ))
+        leverage_errors = {
+            symbol: result.get("error", "Failed to set leverage")
+            for symbol, result in zip(symbols, leverage_results)
+            if not result["success"]
+        }
+        
+        to_place = []
+        for trade, leg in ready:
+            if leg.symbol in leverage_errors:
+                risk_engine.release(trade.id)
+                trade.status = "rejected"
+                trade.reason = f"Order failed: {leverage_errors[leg.symbol]}"
+            else:
+                to_place.append(trade)
+        
+        with metrics.webhook_stage_seconds.time(stage="order"):
+            order_results = await self.client.place_batch_orders([
+                self.client.build_order_params(
+                    trade.symbol,
+                    trade.side,
+                    trade.quantity,
+                    trade.stop_loss,
+                    trade.take_profit
+                )
+                for trade in to_place
+            ])
+        for trade, order_result in zip(to_place, order_results):
+            if order_result["success"]:
+                trade.trade_id = order_result["order_id"]
+                trade.status = "pending"
+                trade.reason = "Order placed, awaiting fill"
+            else:
+                risk_engine.release(trade.id)
+                trade.status = "rejected"
+                trade.reason = f"Order failed: {order_result.get('error', 'Unknown error')}"
+        
+        await self._commit(db)
+        self._observe_latency(received_at)
+        
+        results = []
+        for trade in all_trades:
+            self._log_result(trade)
+            dashboard_hub.publish_trade(trade)
+            if trade.trade_id:
+                fill_tracker.track(trade.id, trade.trade_id, trade.symbol)
+            results.append({
+                "success": bool(trade.trade_id),
+                "message": trade.reason,
+                "trade_id": trade.id,
+                "order_id": trade.trade_id
+            })
+        
+        return {
+            "success": all(result["success"] for result in results),
+            "legs": results
+        }
+    
+    async def execute_signal(self, trade: Trade, signal: WebhookSignal,
+                             db: AsyncSession,
+                             received_at: Optional[float] = None,
+                             account: Optional[Account] = None) -> Dict[str, Any]:
+        """Check the account, size and place the order for a trade"""
+        client = account.client if account else self.client
+        
         # Check account connection
-        connection = self.client.check_connection()
+        with metrics.webhook_stage_seconds.time(stage="connection_check"):
+            connection = await client.check_connection()
         if not connection["connected"]:
             trade.status = "rejected"
             trade.reason = f"Bybit connection failed: {connection.get('error', 'Unknown error')}"
             db.add(trade)
-            await db.commit()
+            await self._commit(db)
+            self._observe_latency(received_at)
+            self._log_result(trade)
+            dashboard_hub.publish_trade(trade)
             return {
                 "success": False,
                 "message": "Trade rejected - Bybit connection failed",
                 "trade_id": trade.id
             }
         
-        # Calculate position size based on risk if not provided
-        if not signal.quantity:
-            account_info = self.client.get_account_info()
-            if account_info["success"]:
-                # Use 1% of balance as default
-                trade.quantity = account_info["balance"] * 0.01
-            else:
-                trade.quantity = config.DEFAULT_POSITION_SIZE
+        with metrics.webhook_stage_seconds.time(stage="sizing"):
+            error = await self.prepare_trade(trade, signal, account)
+        risk = (account or account_registry.primary).risk
+        if not error:
+            # A fan-out account's book is loaded from REST on first use
+            if not risk.book.ready:
+                await risk.book.reconcile()
+            with metrics.webhook_stage_seconds.time(stage="risk"):
+                error = self.check_risk(trade, signal, risk)
+        if error:
+            trade.status = "rejected"
+            trade.reason = error
+            db.add(trade)
+            await self._commit(db)
+            self._observe_latency(received_at)
+            self._log_result(trade)
+            dashboard_hub.publish_trade(trade)
+            return {
+                "success": False,
+                "message": trade.reason,
+                "trade_id": trade.id
+            }
+        
+        # Set leverage first so it is timed apart from the order itself;
+        # place_order then finds it cached and goes straight to the order
+        with metrics.webhook_stage_seconds.time(stage="leverage"):
+            order_result = await client.ensure_leverage(signal.symbol, signal.leverage)
         
         # Place the order
-        order_result = self.client.place_order(
-            symbol=signal.symbol,
-            side=signal.action,
-            qty=trade.quantity,
-            leverage=signal.leverage,  # Pass leverage
-            stop_loss=signal.stop_loss,
-            take_profit=signal.take_profit
-        )
+        if order_result["success"]:
+            start = time.perf_counter()
+            order_result = await client.place_order(
+                symbol=signal.symbol,
+                side=signal.action,
+                qty=trade.quantity,
+                leverage=signal.leverage,  # Pass leverage
+                stop_loss=trade.stop_loss,
+                take_profit=trade.take_profit
+            )
+            latency = time.perf_counter() - start
+            metrics.webhook_stage_seconds.observe(latency, stage="order")
+            account_name = account.name if account else account_registry.primary.name
+            metrics.account_order_seconds.observe(latency, account=account_name)
+            (account or account_registry.primary).record(order_result["success"], latency)
     
         if order_result["success"]:
+            # The fill is confirmed asynchronously by the fill tracker
             trade.trade_id = order_result["order_id"]
-            trade.status = "filled"
-            trade.reason = "Order placed successfully"
-            
-            # Fetch the entry price from the position
-            try:
-                # Small delay to ensure position is created
-                import time
-                time.sleep(0.5)
-                
-                position_result = self.client.session.get_positions(
-                    category="linear",
-                    symbol=signal.symbol
-                )
-                
-                if position_result["retCode"] == 0 and position_result["result"]["list"]:
-                    position_info = position_result["result"]["list"][0]
-                    trade.entry_price = float(position_info.get("avgPrice", 0))
-                else:
-                    # Fallback to data from order result if available
-                    trade.entry_price = float(order_result["data"].get("price", 0))
-            except:
-                # If fetching fails, use the price from order result as fallback
-                trade.entry_price = float(order_result["data"].get("price", 0))
+            trade.status = "pending"
+            trade.reason = "Order placed, awaiting fill"
         else:
+            risk.release(trade.id)
             trade.status = "rejected"
             trade.reason = f"Order failed: {order_result.get('error', 'Unknown error')}"
         
         db.add(trade)
-        await db.commit()
+        await self._commit(db)
+        self._observe_latency(received_at)
+        self._log_result(trade)
+        dashboard_hub.publish_trade(trade)
+        
+        if order_result["success"]:
+            fill_tracker.track(trade.id, trade.trade_id, trade.symbol, account)
         
         return {
             "success": order_result["success"],
@@ -120,10 +472,46 @@ class WebhookHandler:
             "order_id": trade.trade_id if order_result["success"] else None
         }
     
-    async def update_trade_status(self, trade_id: str, db: AsyncSession):
-        """Update trade status from Bybit"""
-        # This would be called periodically to update trade statuses
-        # Implementation depends on specific requirements
-        pass
+    async def _commit(self, db: AsyncSession):
+        """Commit the execution result, timed as the db_commit stage"""
+        start = time.perf_counter()
+        async with write_lock:
+            await db.commit()
+        elapsed = time.perf_counter() - start
+        metrics.webhook_stage_seconds.observe(elapsed, stage="db_commit")
+        metrics.db_commit_seconds.observe(elapsed, site="execute")
+    
+    def _observe_latency(self, received_at: Optional[float]):
+        """Record webhook receipt to exchange answer (or rejection)"""
+        if received_at is not None:
+            metrics.webhook_latency_seconds.observe(time.perf_counter() - received_at)
+    
+    def _log_result(self, trade: Trade):
+        """Log the outcome with the IDs that tie the trade row to its order"""
+        fields = {
+            "trade_id": trade.id,
+            "order_id": trade.trade_id,
+            "account": trade.account,
+            "symbol": trade.symbol,
+            "side": trade.side,
+            "qty": trade.quantity
+        }
+        if trade.trade_id:
+            logger.info("Order placed", extra=fields)
+        else:
+            logger.warning("Trade rejected: %s", trade.reason, extra=fields)
+    
+    async def update_trade_status(self, trade_id: str, db: AsyncSession) -> Optional[Trade]:
+        """Update one trade from its Bybit order (trade_reconciler does this in bulk)"""
+        result = await db.execute(select(Trade).where(Trade.trade_id == trade_id))
+        trade = result.scalar_one_or_none()
+        if not trade:
+            return None
+        
+        order = await self.client.get_order(trade.symbol, trade_id)
+        if order and order.get("orderStatus") in FINAL_ORDER_STATES and apply_order_update(trade, order):
+            await db.commit()
+            dashboard_hub.publish_trade(trade)
+        return trade
 
 webhook_handler = WebhookHandler()
\ No newline at end of file
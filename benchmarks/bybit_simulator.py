@@ -0,0 +1,309 @@
+"""
+Local stand-in for the Bybit v5 REST endpoints the trading system uses,
+with configurable latency, error and rate-limit injection.
+
+Usage (from the repository root):
+    python benchmarks/bybit_simulator.py --port 9000 --latency-ms 20 --jitter-ms 10 --error-rate 0.01
+    cd backend && BYBIT_BASE_URL=http://127.0.0.1:9000 python main.py
+
+Orders fill at once at a randomly walking price (see SimulatedExchange).
+Signatures are not checked. With --rate-limit, every endpoint allows that
+many requests per second and answers with retCode 10006 beyond it; the
+X-Bapi-Limit headers it sends also set the client's own per-endpoint
+budget. The WebSocket streams are not simulated. GET /sim/stats reports
+what was served and injected.
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from simulated_exchange import SimulatedExchange
+
+# v5 retCodes the client handles
+PARAMS_ERROR = 10001
+RATE_LIMITED = 10006
+SERVER_ERROR = 10016
+ORDER_NOT_EXISTS = 110001
+LEVERAGE_NOT_MODIFIED = 110043
+
+def response(result: Any = None, code: int = 0, message: str = "OK",
+             ext: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {
+        "retCode": code,
+        "retMsg": message,
+        "result": result if result is not None else {},
+        "retExtInfo": ext or {},
+        "time": int(time.time() * 1000)
+    }
+
+def page(records: List[Dict[str, Any]], params, default_limit: int, max_limit: int) -> Dict[str, Any]:
+    """Newest-first page of records filtered like the v5 list endpoints"""
+    if params.get("orderId"):
+        records = [r for r in records if r["orderId"] == params["orderId"]]
+    if params.get("symbol"):
+        records = [r for r in records if r["symbol"] == params["symbol"]]
+    if params.get("startTime"):
+        records = [r for r in records if int(r["createdTime"]) >= int(params["startTime"])]
+    if params.get("endTime"):
+        records = [r for r in records if int(r["createdTime"]) <= int(params["endTime"])]
+    records = records[::-1]
+
+    limit = min(int(params.get("limit") or default_limit), max_limit)
+    offset = int(params.get("cursor") or 0)
+    rows = records[offset:offset + limit]
+    more = offset + limit < len(records)
+    return {"category": "linear", "list": rows, "nextPageCursor": str(offset + limit) if more else ""}
+
+def qty_step(price: float) -> str:
+    if price >= 1000:
+        return "0.001"
+    if price >= 10:
+        return "0.01"
+    return "1"
+
+class Injector:
+    """Latency, failures and per-endpoint rate limits applied to every v5 call"""
+
+    def __init__(self, args):
+        self.latency = args.latency_ms / 1000
+        self.jitter = args.jitter_ms / 1000
+        self.error_rate = args.error_rate
+        self.http_error_rate = args.http_error_rate
+        self.rate_limit = args.rate_limit
+        self._windows: Dict[str, List[int]] = {}
+        self.requests: Counter = Counter()
+        self.injected: Counter = Counter()
+
+    def take(self, path: str) -> Tuple[Optional[Dict[str, str]], bool]:
+        """Count a request in the path's one-second window.
+
+        Returns the rate-limit headers to send and whether it is allowed.
+        """
+        if not self.rate_limit:
+            return None, True
+        second = int(time.time())
+        window = self._windows.get(path)
+        if window is None or window[0] != second:
+            window = self._windows[path] = [second, 0]
+        window[1] += 1
+        headers = {
+            "X-Bapi-Limit": str(self.rate_limit),
+            "X-Bapi-Limit-Status": str(max(0, self.rate_limit - window[1])),
+            "X-Bapi-Limit-Reset-Timestamp": str((second + 1) * 1000)
+        }
+        return headers, window[1] <= self.rate_limit
+
+def create_app(args) -> FastAPI:
+    app = FastAPI(title="Bybit simulator")
+    rng = random.Random(args.seed)
+    exchange = SimulatedExchange(args.balance, fee_rate=args.fee_rate)
+    for entry in args.symbols.split(","):
+        symbol, price = entry.split("=")
+        exchange.set_price(symbol.strip(), float(price))
+    injector = Injector(args)
+    app.state.exchange = exchange
+
+    async def walk_prices():
+        while True:
+            await asyncio.sleep(args.tick)
+            for symbol, price in list(exchange.prices.items()):
+                exchange.set_price(symbol, price * math.exp(rng.gauss(0, args.volatility)))
+
+    @app.on_event("startup")
+    async def startup():
+        app.state.walker = asyncio.create_task(walk_prices())
+
+    @app.middleware("http")
+    async def inject(request: Request, call_next):
+        path = request.url.path
+        if not path.startswith("/v5/"):
+            return await call_next(request)
+        injector.requests[path] += 1
+
+        delay = injector.latency + rng.uniform(0, injector.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if rng.random() < injector.http_error_rate:
+            injector.injected["http_503"] += 1
+            return JSONResponse(status_code=503, content={"error": "Service unavailable (simulated)"})
+
+        headers, allowed = injector.take(path)
+        if not allowed:
+            injector.injected["rate_limited"] += 1
+            return JSONResponse(response(code=RATE_LIMITED, message="Too many visits!"), headers=headers)
+        if rng.random() < injector.error_rate:
+            injector.injected["server_error"] += 1
+            return JSONResponse(response(code=SERVER_ERROR, message="Server error (simulated)"), headers=headers)
+
+        result = await call_next(request)
+        if headers:
+            result.headers.update(headers)
+        return result
+
+    def raw_positions(symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [
+            {
+                "symbol": pos["symbol"],
+                "side": pos["side"],
+                "size": str(pos["size"]),
+                "avgPrice": str(pos["entry_price"]),
+                "markPrice": str(pos["current_price"]),
+                "unrealisedPnl": str(pos["pnl"]),
+                "leverage": str(pos["leverage"]),
+                "positionValue": str(pos["size"] * pos["entry_price"]),
+                "positionIdx": 0
+            }
+            for pos in exchange.position_list()
+            if symbol is None or pos["symbol"] == symbol
+        ]
+
+    def create(order: Dict[str, Any]) -> Dict[str, Any]:
+        symbol = order.get("symbol")
+        if symbol not in exchange.prices:
+            return response(code=PARAMS_ERROR, message="params error: symbol invalid")
+        try:
+            qty = float(order.get("qty") or 0)
+        except ValueError:
+            qty = 0
+        if qty <= 0 or order.get("side") not in ("Buy", "Sell"):
+            return response(code=PARAMS_ERROR, message="params error: qty or side invalid")
+        filled = exchange.execute(
+            symbol,
+            order["side"],
+            qty,
+            exchange.prices[symbol],
+            stop_loss=float(order["stopLoss"]) if order.get("stopLoss") else None,
+            take_profit=float(order["takeProfit"]) if order.get("takeProfit") else None
+        )
+        return response({"orderId": filled["orderId"], "orderLinkId": order.get("orderLinkId", "")})
+
+    @app.get("/v5/account/wallet-balance")
+    async def wallet_balance():
+        equity = exchange.balance + exchange.unrealized_pnl()
+        return response({"list": [{
+            "accountType": "UNIFIED",
+            "totalEquity": str(equity),
+            "totalAvailableBalance": str(exchange.balance),
+            "coin": [{"coin": "USDT", "walletBalance": str(exchange.balance), "equity": str(equity)}]
+        }]})
+
+    @app.post("/v5/order/create")
+    async def order_create(request: Request):
+        return create(await request.json())
+
+    @app.post("/v5/order/create-batch")
+    async def order_create_batch(request: Request):
+        results = [create(order) for order in (await request.json()).get("request", [])]
+        return response(
+            {"list": [result["result"] or {"orderId": ""} for result in results]},
+            ext={"list": [{"code": result["retCode"], "msg": result["retMsg"]} for result in results]}
+        )
+
+    @app.post("/v5/order/cancel")
+    async def order_cancel():
+        # Market orders are filled before they can be cancelled
+        return response(code=ORDER_NOT_EXISTS, message="order not exists or too late to cancel")
+
+    @app.get("/v5/order/realtime")
+    async def order_realtime(request: Request):
+        return response(page(list(exchange.orders.values()), request.query_params, 20, 50))
+
+    @app.get("/v5/order/history")
+    async def order_history(request: Request):
+        return response(page(list(exchange.orders.values()), request.query_params, 20, 50))
+
+    @app.get("/v5/position/closed-pnl")
+    async def closed_pnl(request: Request):
+        return response(page(exchange.closed_pnl, request.query_params, 50, 100))
+
+    @app.get("/v5/position/list")
+    async def position_list(symbol: Optional[str] = None):
+        return response({"category": "linear", "list": raw_positions(symbol), "nextPageCursor": ""})
+
+    @app.post("/v5/position/set-leverage")
+    async def set_leverage(request: Request):
+        params = await request.json()
+        leverage = float(params.get("buyLeverage") or 0)
+        if leverage <= 0:
+            return response(code=PARAMS_ERROR, message="params error: leverage invalid")
+        if exchange.leverage_cache.get(params.get("symbol")) == leverage:
+            return response(code=LEVERAGE_NOT_MODIFIED, message="leverage not modified")
+        exchange.leverage_cache[params.get("symbol")] = leverage
+        return response()
+
+    @app.get("/v5/market/tickers")
+    async def tickers(symbol: Optional[str] = None):
+        return response({"category": "linear", "list": [
+            {"symbol": name, "markPrice": str(price), "lastPrice": str(price)}
+            for name, price in exchange.prices.items()
+            if symbol is None or name == symbol
+        ]})
+
+    @app.get("/v5/market/instruments-info")
+    async def instruments_info():
+        return response({"category": "linear", "nextPageCursor": "", "list": [
+            {
+                "symbol": symbol,
+                "status": "Trading",
+                "lotSizeFilter": {
+                    "qtyStep": qty_step(price),
+                    "minOrderQty": qty_step(price),
+                    "maxOrderQty": "1000000",
+                    "maxMktOrderQty": "100000",
+                    "minNotionalValue": "5"
+                },
+                "priceFilter": {"tickSize": "0.01"},
+                "leverageFilter": {"minLeverage": "1", "maxLeverage": "100"}
+            }
+            for symbol, price in exchange.prices.items()
+        ]})
+
+    @app.get("/sim/stats")
+    async def stats():
+        return {
+            "requests": dict(injector.requests),
+            "injected": dict(injector.injected),
+            "orders": len(exchange.orders),
+            "stops_triggered": exchange.triggered,
+            "open_positions": exchange.position_list(),
+            "balance": exchange.balance,
+            "realized_pnl": sum(exchange.realized_by_symbol.values()),
+            "fees": exchange.fees,
+            "prices": exchange.prices
+        }
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--symbols", default="BTCUSDT=60000,ETHUSDT=3000,SOLUSDT=150")
+    parser.add_argument("--balance", type=float, default=10000.0)
+    parser.add_argument("--fee-rate", type=float, default=0.00055)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added to every request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="uniform extra latency, up to")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share answered with retCode 10016")
+    parser.add_argument("--http-error-rate", type=float, default=0.0, help="share answered with HTTP 503")
+    parser.add_argument("--rate-limit", type=int, default=0, help="requests per second per endpoint, 0 = none")
+    parser.add_argument("--volatility", type=float, default=0.0005, help="log-price step per tick")
+    parser.add_argument("--tick", type=float, default=0.1, help="seconds between price steps")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Replay a signal journal through the webhook handler against a simulated
+exchange and report throughput and PnL.
+
+Usage (from the repository root):
+    python benchmarks/replay_signals.py run backend/signals.jsonl --klines klines.csv --balance 10000
+    python benchmarks/replay_signals.py backfill signals.jsonl --database sqlite:///backend/trading_system.db
+
+``run`` writes trades to a scratch database in a temporary directory.
+``backfill`` builds a journal from the webhook_data of recorded trades.
+The klines CSV needs symbol, timestamp (ms or s) and close columns.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, BACKEND)
+
+async def run(args):
+    from replay import ReplayEngine, SimulatedExchange, load_klines
+    from signal_journal import read_journal
+    from database import engine
+
+    settings = {
+        name: value
+        for name, value in (("max_position_size", args.max_position_size),
+                            ("risk_percentage", args.risk_percentage))
+        if value is not None
+    }
+    exchange = SimulatedExchange(args.balance, fee_rate=args.fee_rate)
+    klines = load_klines(args.klines) if args.klines else None
+    replay = ReplayEngine(exchange, klines, settings)
+    report = await replay.run(read_journal(args.journal, args.start, args.end))
+    await engine.dispose()
+    print(json.dumps(report, indent=2, default=str))
+
+async def backfill(args):
+    from replay import backfill_journal
+    from database import engine
+    count = await backfill_journal(args.output)
+    await engine.dispose()
+    print(f"{count} signals written to {args.output}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="replay a journal")
+    run_parser.add_argument("journal")
+    run_parser.add_argument("--klines", help="CSV of symbol,timestamp,close")
+    run_parser.add_argument("--balance", type=float, default=10000.0)
+    run_parser.add_argument("--fee-rate", type=float, default=0.00055)
+    run_parser.add_argument("--start", type=float, help="first signal time, epoch seconds")
+    run_parser.add_argument("--end", type=float, help="end of the signal window, epoch seconds")
+    run_parser.add_argument("--max-position-size", type=float)
+    run_parser.add_argument("--risk-percentage", type=float)
+
+    backfill_parser = commands.add_parser("backfill", help="build a journal from recorded trades")
+    backfill_parser.add_argument("output")
+    backfill_parser.add_argument("--database", default=os.getenv("DATABASE_URL"))
+    args = parser.parse_args()
+
+    # Rejections are expected in a replay; only show errors
+    logging.basicConfig(level=logging.ERROR)
+    # The backend reads these at import time
+    os.environ["SIGNAL_JOURNAL_PATH"] = ""
+    if args.command == "run":
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'replay.db')}"
+            asyncio.run(run(args))
+    else:
+        if args.database:
+            os.environ["DATABASE_URL"] = args.database
+        asyncio.run(backfill(args))
+
+if __name__ == "__main__":
+    main()
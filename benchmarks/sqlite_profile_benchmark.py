@@ -0,0 +1,93 @@
+"""
+Benchmark webhook-style trade inserts while /api/trades-style reads run
+concurrently, once per database profile.
+
+Usage (from the repository root):
+    python benchmarks/sqlite_profile_benchmark.py --seconds 10 --writers 8 --readers 8
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from sqlalchemy import select, desc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from database import create_engine_for
+from models import Base, Trade
+
+async def writer(session_maker, deadline: float, counter: list):
+    while time.perf_counter() < deadline:
+        async with session_maker() as session:
+            session.add(Trade(
+                symbol="BTCUSDT",
+                side="BUY",
+                quantity=0.01,
+                leverage=1,
+                status="pending",
+                webhook_data='{"action": "buy", "symbol": "BTCUSDT"}'
+            ))
+            await session.commit()
+        counter[0] += 1
+
+async def reader(session_maker, deadline: float, counter: list):
+    while time.perf_counter() < deadline:
+        async with session_maker() as session:
+            result = await session.execute(
+                select(Trade).order_by(desc(Trade.created_at)).limit(50)
+            )
+            result.scalars().all()
+        counter[0] += 1
+
+async def run_profile(profile: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine_for(url, profile=profile, echo=False)
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        # Seed some history so reads have something to sort
+        async with session_maker() as session:
+            session.add_all([
+                Trade(symbol="ETHUSDT", side="SELL", quantity=1.0, status="filled")
+                for _ in range(args.seed_rows)
+            ])
+            await session.commit()
+
+        inserts, reads = [0], [0]
+        deadline = time.perf_counter() + args.seconds
+        await asyncio.gather(
+            *(writer(session_maker, deadline, inserts) for _ in range(args.writers)),
+            *(reader(session_maker, deadline, reads) for _ in range(args.readers)),
+            return_exceptions=False
+        )
+        await engine.dispose()
+
+    return {
+        "profile": profile,
+        "inserts_per_sec": inserts[0] / args.seconds,
+        "reads_per_sec": reads[0] / args.seconds
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seed-rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:.0f}s per profile")
+    print(f"{'profile':<12}{'inserts/s':>12}{'reads/s':>12}")
+    for profile in ("default", "production"):
+        result = await run_profile(profile, args)
+        print(f"{result['profile']:<12}{result['inserts_per_sec']:>12.1f}{result['reads_per_sec']:>12.1f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
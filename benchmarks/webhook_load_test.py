@@ -0,0 +1,155 @@
+"""
+Fire webhook signals at a running trading system and report acceptance
+latency, throughput and how long the order path takes to settle them.
+
+Usage (from the repository root), against the exchange simulator:
+    python benchmarks/bybit_simulator.py --port 9000 --latency-ms 20 --rate-limit 50 &
+    (cd backend && BYBIT_BASE_URL=http://127.0.0.1:9000 WEBHOOK_SECRET=secret python main.py &)
+    python benchmarks/webhook_load_test.py --token secret --requests 1000 --concurrency 50 \\
+        --simulator http://127.0.0.1:9000
+
+Every signal carries a unique idempotency_key so none is deduplicated.
+By default a fixed number of requests is kept in flight (closed loop),
+which measures saturation throughput; --rate sends signals on a fixed
+schedule like alerts arriving, which measures acknowledgement latency at
+that load. Run the simulator on other cores where possible: on one core
+its work and the load generator's show up as server latency.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import Counter
+
+import httpx
+
+# States a trade reaches once the exchange has answered for its order
+SETTLED = {"filled", "rejected", "cancelled"}
+
+def percentile(values, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))] * 1000 if values else 0.0
+
+async def send(client, args, rng, latencies, statuses, trade_ids):
+    symbol = rng.choice(args.symbols.split(","))
+    signal = {
+        "action": rng.choice(["buy", "sell"]),
+        "symbol": symbol,
+        "quantity": args.quantity.get(symbol),
+        "alert_message": "load-test",
+        "idempotency_key": uuid.uuid4().hex
+    }
+    start = time.perf_counter()
+    try:
+        response = await client.post("/api/webhook", params={"token": args.token}, json=signal)
+    except httpx.HTTPError as e:
+        statuses[type(e).__name__] += 1
+        return
+    latencies.append(time.perf_counter() - start)
+    statuses[response.status_code] += 1
+    if response.status_code == 202:
+        trade_ids.append(response.json()["trade_id"])
+
+async def settle(client, trade_ids, timeout: float, concurrency: int) -> Counter:
+    """Poll the trades until every one is settled or the timeout passes"""
+    outcomes = {}
+    pending = list(trade_ids)
+    deadline = time.perf_counter() + timeout
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def check(trade_id):
+        async with semaphore:
+            response = await client.get(f"/api/trades/{trade_id}")
+        trade = response.json()
+        if trade["status"] in SETTLED:
+            outcomes[trade_id] = trade["status"]
+
+    while pending and time.perf_counter() < deadline:
+        await asyncio.gather(*(check(trade_id) for trade_id in pending))
+        pending = [trade_id for trade_id in pending if trade_id not in outcomes]
+        if pending:
+            await asyncio.sleep(0.5)
+    counts = Counter(outcomes.values())
+    if pending:
+        counts["unsettled"] = len(pending)
+    return counts
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--token", required=True, help="the server's WEBHOOK_SECRET")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20,
+                        help="requests in flight; with --rate, the connection limit")
+    parser.add_argument("--rate", type=float,
+                        help="send this many signals per second (open loop) instead")
+    parser.add_argument("--symbols", default="BTCUSDT,ETHUSDT,SOLUSDT")
+    parser.add_argument("--quantity", default="BTCUSDT=0.001,ETHUSDT=0.01,SOLUSDT=0.1",
+                        help="order size per symbol; others are sized by the server")
+    parser.add_argument("--settle-timeout", type=float, default=120.0)
+    parser.add_argument("--simulator", help="exchange simulator URL, for its /sim/stats")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    args.quantity = {
+        symbol: float(qty)
+        for symbol, qty in (entry.split("=") for entry in args.quantity.split(",") if entry)
+    }
+
+    rng = random.Random(args.seed)
+    latencies, statuses, trade_ids = [], Counter(), []
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=30.0, limits=limits) as client:
+        started = time.perf_counter()
+        if args.rate:
+            # Open loop: signals arrive on schedule however slow the answers are
+            tasks = []
+            for i in range(args.requests):
+                delay = started + i / args.rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.create_task(send(client, args, rng, latencies, statuses, trade_ids)))
+            await asyncio.gather(*tasks)
+        else:
+            remaining = iter(range(args.requests))
+
+            async def worker():
+                for _ in remaining:
+                    await send(client, args, rng, latencies, statuses, trade_ids)
+
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        sent = time.perf_counter() - started
+
+        outcomes = await settle(client, trade_ids, args.settle_timeout, args.concurrency)
+        settled = time.perf_counter() - started
+        rate_limits = (await client.get("/api/rate-limits")).json()
+
+    report = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "rate": args.rate,
+        "http_status": {str(code): count for code, count in statuses.items()},
+        "accepted_per_s": len(trade_ids) / sent if sent else 0.0,
+        "accept_latency_ms": {
+            "p50": percentile(latencies, 0.5),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies) * 1000 if latencies else 0.0
+        },
+        "send_s": sent,
+        "settle_s": settled,
+        "settled_per_s": sum(outcomes.values()) / settled if settled else 0.0,
+        "outcomes": dict(outcomes),
+        "rate_limits": {
+            group: stats for group, stats in rate_limits.items() if stats["requests"]
+        }
+    }
+    if args.simulator:
+        async with httpx.AsyncClient(base_url=args.simulator) as client:
+            report["simulator"] = (await client.get("/sim/stats")).json()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    asyncio.run(main())
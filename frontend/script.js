@@ -9,6 +9,11 @@ const API_URL = '/api';
 //const API_URL = 'https://trading.theinvestmaster.in/api';
 // State
 let currentPositionToClose = null;
+let positionsBySymbol = {};
+let trades = [];
+let dashboardSocket = null;
+let pollTimer = null;
+let reconnectDelay = 1000;
 
 // DOM Elements
 const connectionStatus = document.getElementById('connectionStatus');
@@ -65,13 +70,68 @@ async function initializeApp() {
     await loadPositions();
     await loadTradeHistory();
     
-    // Refresh data every 5 seconds
-    setInterval(() => {
+    // Live updates are pushed over the dashboard WebSocket
+    connectDashboard();
+}
+
+// Live dashboard stream; falls back to polling while disconnected
+function connectDashboard() {
+    const token = localStorage.getItem('access_token');
+    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+    dashboardSocket = new WebSocket(`${protocol}//${window.location.host}/ws/dashboard?token=${encodeURIComponent(token)}`);
+    
+    dashboardSocket.onopen = () => {
+        reconnectDelay = 1000;
+        stopPolling();
+    };
+    
+    dashboardSocket.onmessage = (event) => {
+        handleDashboardMessage(JSON.parse(event.data));
+    };
+    
+    dashboardSocket.onclose = () => {
+        startPolling();
+        setTimeout(connectDashboard, reconnectDelay);
+        reconnectDelay = Math.min(reconnectDelay * 2, 30000);
+    };
+}
+
+function handleDashboardMessage(message) {
+    switch (message.type) {
+        case 'snapshot':
+            if (message.account) updateAccountStatus(message.account);
+            positionsBySymbol = {};
+            message.positions.forEach(pos => { positionsBySymbol[pos.symbol] = pos; });
+            updatePositionsTable(Object.values(positionsBySymbol));
+            break;
+        case 'account':
+            updateAccountStatus(message);
+            break;
+        case 'positions':
+            message.upsert.forEach(pos => { positionsBySymbol[pos.symbol] = pos; });
+            message.remove.forEach(symbol => { delete positionsBySymbol[symbol]; });
+            updatePositionsTable(Object.values(positionsBySymbol));
+            break;
+        case 'trade':
+            upsertTrade(message.trade);
+            break;
+    }
+}
+
+function startPolling() {
+    if (pollTimer) return;
+    pollTimer = setInterval(() => {
         checkAccountStatus();
         loadPositions();
     }, 5000);
 }
 
+function stopPolling() {
+    if (!pollTimer) return;
+    clearInterval(pollTimer);
+    pollTimer = null;
+}
+
 function setupEventListeners() {
     autoTradingToggle.addEventListener('change', saveSettings);
     confirmCancelBtn.addEventListener('click', confirmCancelOrder);
@@ -92,16 +152,7 @@ async function checkAccountStatus() {
         if (!response) return; // Handle auth redirect
         
         const data = await response.json();
-        
-        if (data.connected) {
-            connectionStatus.classList.add('connected');
-            connectionStatus.classList.remove('disconnected');
-            accountInfo.textContent = `Balance: $${data.balance?.toFixed(2) || '0.00'} | Available: $${data.available_balance?.toFixed(2) || '0.00'}`;
-        } else {
-            connectionStatus.classList.add('disconnected');
-            connectionStatus.classList.remove('connected');
-            accountInfo.textContent = 'Disconnected';
-        }
+        updateAccountStatus(data);
     } catch (error) {
         console.error('Error checking account status:', error);
         connectionStatus.classList.add('disconnected');
@@ -109,6 +160,18 @@ async function checkAccountStatus() {
     }
 }
 
+function updateAccountStatus(data) {
+    if (data.connected) {
+        connectionStatus.classList.add('connected');
+        connectionStatus.classList.remove('disconnected');
+        accountInfo.textContent = `Balance: $${data.balance?.toFixed(2) || '0.00'} | Available: $${data.available_balance?.toFixed(2) || '0.00'}`;
+    } else {
+        connectionStatus.classList.add('disconnected');
+        connectionStatus.classList.remove('connected');
+        accountInfo.textContent = 'Disconnected';
+    }
+}
+
 async function loadSettings() {
     try {
         const response = await fetchWithAuth(`${API_URL}/settings`);
@@ -158,6 +221,8 @@ async function loadPositions() {
         if (!response) return; // Handle auth redirect
         
         const positions = await response.json();
+        positionsBySymbol = {};
+        positions.forEach(pos => { positionsBySymbol[pos.symbol] = pos; });
         updatePositionsTable(positions);
     } catch (error) {
         console.error('Error loading positions:', error);
@@ -199,37 +264,52 @@ async function loadTradeHistory() {
         const response = await fetchWithAuth(`${API_URL}/trades?limit=50`);
         if (!response) return; // Handle auth redirect
         
-        const trades = await response.json();
-        
-        if (trades.length === 0) {
-            historyBody.innerHTML = '<tr><td colspan="7" class="empty-message">No trade history</td></tr>';
-            return;
-        }
-        
-        const rows = trades.map(trade => {
-            const statusClass = trade.status === 'filled' ? 'profit' : 
-                              trade.status === 'cancelled' ? 'loss' : '';
-            
-            return `
-                <tr>
-                    <td>${new Date(trade.created_at).toLocaleString()}</td>
-                    <td>${trade.symbol}</td>
-                    <td>${trade.side}</td>
-                    <td>${trade.quantity}</td>
-                    <td>${trade.entry_price ? `$${trade.entry_price.toFixed(4)}` : '-'}</td>
-                    <td class="${statusClass}">${trade.status.toUpperCase()}</td>
-                    <td>${trade.reason || '-'}</td>
-                </tr>
-            `;
-        }).join('');
-        
-        historyBody.innerHTML = rows;
+        trades = await response.json();
+        renderTradeHistory();
     } catch (error) {
         console.error('Error loading trade history:', error);
         historyBody.innerHTML = '<tr><td colspan="7" class="empty-message">Error loading trade history</td></tr>';
     }
 }
 
+// Insert or replace a trade pushed by the server, newest first
+function upsertTrade(trade) {
+    const index = trades.findIndex(t => t.id === trade.id);
+    if (index >= 0) {
+        trades[index] = trade;
+    } else {
+        trades.unshift(trade);
+        trades = trades.slice(0, 50);
+    }
+    renderTradeHistory();
+}
+
+function renderTradeHistory() {
+    if (trades.length === 0) {
+        historyBody.innerHTML = '<tr><td colspan="7" class="empty-message">No trade history</td></tr>';
+        return;
+    }
+    
+    const rows = trades.map(trade => {
+        const statusClass = trade.status === 'filled' ? 'profit' : 
+                          trade.status === 'cancelled' ? 'loss' : '';
+        
+        return `
+            <tr>
+                <td>${new Date(trade.created_at).toLocaleString()}</td>
+                <td>${trade.symbol}</td>
+                <td>${trade.side}</td>
+                <td>${trade.quantity}</td>
+                <td>${trade.entry_price ? `$${trade.entry_price.toFixed(4)}` : '-'}</td>
+                <td class="${statusClass}">${trade.status.toUpperCase()}</td>
+                <td>${trade.reason || '-'}</td>
+            </tr>
+        `;
+    }).join('');
+    
+    historyBody.innerHTML = rows;
+}
+
 // Show close modal function
 function showCloseModal(symbol, side, size) {
     currentPositionToClose = { symbol, side, size };